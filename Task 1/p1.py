@@ -1,4 +1,17 @@
+import concurrent.futures
+import heapq
+import io
 import itertools
+import multiprocessing
+import os
+import re
+import sys
+import time
+import tracemalloc
+import weakref
+
+# The opcodes of the programs that `Exp.value` runs.
+VAR, CONST, NOT, AND, OR, IMPLIES, IFF = range(7)
 
 
 
@@ -13,20 +26,62 @@ class Exp(object):
     (the Unicode symbol for conjunction). The reserved symbol for a
     variable is its name, such as `x` or `y`.
 
+    Expressions are hash-consed: constructing an expression that is
+    structurally identical to an existing one returns the existing object.
+    Structural equality is therefore the same as identity, expressions are
+    shared between all formulas that contain them, and they can serve as
+    cheap dictionary keys. Expressions must not be modified.
+
     Attributes:
         sym: The reserved symbol of the expression (a string).
         sexps: The list of subexpressions (instances of the class `Exp`).
+        depth: The length of the longest path from this expression to a
+            variable, counting nodes.
     """
 
-    def __init__(self, sym, *sexps):
-        """Constructs a new expression.
+    __slots__ = ('sym', 'sexps', 'depth', '_variables', '_hash', '_program', '__weakref__')
+
+    # All expressions that are currently alive, indexed by their class,
+    # reserved symbol and subexpressions.
+    _interned = weakref.WeakValueDictionary()
+
+    # Python expressions that compute the value of this kind of expression
+    # from the values of its subexpressions, used by `compile`.
+    template = None
+    bitwise_template = None
+
+    # The operation of this kind of expression in the programs run by
+    # `value` (see `_flatten`), or None to call `combine`.
+    opcode = None
+
+    def __new__(cls, sym, *sexps):
+        """Constructs a new expression, or returns the existing expression
+        with the same class, reserved symbol and subexpressions.
 
         Args:
             sym: The reserved symbol for this expression.
             sexps: The list of subexpressions.
         """
+        key = (cls, sym, sexps)
+        self = Exp._interned.get(key)
+        if self is not None:
+            return self
+        self = object.__new__(cls)
         self.sym = sym
         self.sexps = sexps
+        self._hash = hash((sym, sexps))
+        self._program = None
+        # The variables are computed on demand (see `variables`): a set per
+        # node would take memory quadratic in the length of a chain.
+        self._variables = None
+        self.depth = 1 + max(sexp.depth for sexp in sexps) if sexps else 1
+        return Exp._interned.setdefault(key, self)
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (from_postfix, (postfix(self),))
 
     def value(self, assignment):
         """Returns the value of this expression under the specified truth
@@ -40,96 +95,516 @@ class Exp(object):
             The value of this expression under the specified truth
             assignment: either `True` or `False`.
         """
+        program = self._program
+        if program is None:
+            program = self._program = self._flatten()
+        values = []
+        append = values.append
+        for opcode, a, b in program:
+            if opcode == VAR:
+                append(assignment[a])
+            elif opcode == AND:
+                append(values[a] and values[b])
+            elif opcode == OR:
+                append(values[a] or values[b])
+            elif opcode == NOT:
+                append(not values[a])
+            elif opcode == IMPLIES:
+                append(not values[a] or values[b])
+            elif opcode == IFF:
+                append(values[a] == values[b])
+            elif opcode == CONST:
+                append(a)
+            else:
+                append(a.combine(*[values[i] for i in b]))
+        return values[-1]
+
+    def _flatten(self):
+        """Returns the program that `value` runs for this expression.
+
+        The program has one step (opcode, a, b) per distinct
+        subexpression, in postorder, and every step computes the value of
+        its subexpression from the values of earlier steps; a and b are the
+        positions of the steps for the subexpressions. A variable step has
+        the name of the variable as a, a constant step its value, and a
+        subexpression without an opcode is evaluated by calling `combine`
+        on a, the subexpression, with the values of the steps in b.
+        """
+        position = {}
+        program = []
+        for node in postorder(self):
+            args = [position[id(sexp)] for sexp in node.sexps]
+            if node.opcode == VAR:
+                program.append((VAR, node.sym, None))
+            elif node.opcode == CONST:
+                program.append((CONST, node.combine(), None))
+            elif node.opcode is None:
+                program.append((None, node, args))
+            else:
+                program.append((node.opcode, args[0], args[-1]))
+            position[id(node)] = len(program) - 1
+        return tuple(program)
+
+    @staticmethod
+    def combine(*values):
+        """Returns the value of this kind of expression, given the values of
+        its subexpressions."""
         raise ValueError()
 
     def variables(self):
         """Returns the (names of the) variables in this expression.
 
         Returns:
-           The names of the variables in this expression, as a set.
+           The names of the variables in this expression, as a set. The set
+           is computed on the first call, in one traversal of the
+           expression, and cached on this expression only; it must not be
+           modified.
+        """
+        if self._variables is None:
+            self._variables = frozenset(
+                node.sym for node in postorder(self) if isinstance(node, Var))
+        return self._variables
+
+    def compile(self, variables=None, bitwise=False):
+        """Compiles this expression into a specialised Python function.
+
+        The compiled function takes a sequence of truth values, one for each
+        variable, and returns the value of this expression under the
+        corresponding truth assignment. It consists of one assignment
+        statement per distinct subexpression, so there is no method
+        dispatch or dictionary lookup during evaluation, and subexpressions
+        that occur several times are computed only once. Local
+        names are reused as soon as their value is no longer needed.
+
+        In bitwise mode, the truth values are integers that are read as bit
+        vectors, and the compiled function evaluates the expression for all
+        bit positions at once. Negation flips all bits, so the result must
+        be masked to the width of the inputs.
+
+        Args:
+            variables: The order of the variables in the argument of the
+                compiled function, as a sequence of variable names.
+                Defaults to the variables of this expression in sorted
+                order.
+            bitwise: Whether to compile to bitwise operations.
+
+        Returns:
+            The compiled function. Its attribute `variables` holds the
+            variable order as a tuple.
         """
-        variables = set()
-        for sexp in self.sexps:
-            variables |= sexp.variables()
-        return variables
+        if variables is None:
+            variables = sorted(self.variables())
+        variables = tuple(variables)
+        index = {name: i for i, name in enumerate(variables)}
+        nodes = list(postorder(self))
+        last_use = {}
+        for i, node in enumerate(nodes):
+            for sexp in node.sexps:
+                last_use[id(sexp)] = i
+        local = {}
+        free = []
+        lines = ["def compiled(v):"]
+        for i, node in enumerate(nodes):
+            if isinstance(node, Var):
+                code = "v[{}]".format(index[node.sym])
+            else:
+                template = node.bitwise_template if bitwise else node.template
+                code = template.format(*[local[id(sexp)] for sexp in node.sexps])
+            for key in {id(sexp) for sexp in node.sexps}:
+                if last_use[key] == i:
+                    free.append(local[key])
+            name = free.pop() if free else "t{}".format(len(local))
+            lines.append("    {} = {}".format(name, code))
+            local[id(node)] = name
+        lines.append("    return {}".format(local[id(self)]))
+        namespace = {}
+        exec(compile("\n".join(lines), "<compiled {}>".format(self.sym), "exec"), namespace)
+        compiled = namespace["compiled"]
+        compiled.variables = variables
+        return compiled
 
 
 class Var(Exp):
     """A variable."""
 
-    def __init__(self, sym):
-        super().__init__(sym)
+    __slots__ = ()
+
+    opcode = VAR
+
+    def __new__(cls, sym):
+        self = super().__new__(cls, sym)
+        self._variables = frozenset([sym])
+        return self
 
     def value(self, assignment):
         assert len(self.sexps) == 0
         return assignment[self.sym]
 
-    def variables(self):
-        assert len(self.sexps) == 0
-        return {self.sym}
+
+class Verum(Exp):
+    """The constant true."""
+
+    __slots__ = ()
+
+    template = 'True'
+    bitwise_template = '-1'
+    opcode = CONST
+
+    def __new__(cls):
+        return super().__new__(cls, '1')
+
+    @staticmethod
+    def combine():
+        return True
+
+
+class Falsum(Exp):
+    """The constant false."""
+
+    __slots__ = ()
+
+    template = 'False'
+    bitwise_template = '0'
+    opcode = CONST
+
+    def __new__(cls):
+        return super().__new__(cls, '0')
+
+    @staticmethod
+    def combine():
+        return False
 
 
 class Nega(Exp):
     """Logical not."""
 
-    def __init__(self, sexp1):
-        super().__init__('-|', sexp1)
+    __slots__ = ()
 
-    def value(self, assignment):
-        assert len(self.sexps) == 1
-        return \
-            not self.sexps[0].value(assignment)
+    template = 'not {0}'
+    bitwise_template = '~{0}'
+    opcode = NOT
+
+    def __new__(cls, sexp1):
+        return super().__new__(cls, '-|', sexp1)
+
+    @staticmethod
+    def combine(value1):
+        return not value1
 
 
 class Conj(Exp):
     """Logical and."""
 
-    def __init__(self, sexp1, sexp2):
-        super().__init__('∧', sexp1, sexp2)
+    __slots__ = ()
 
-    def value(self, assignment):
-        assert len(self.sexps) == 2
-        return \
-            self.sexps[0].value(assignment) and \
-            self.sexps[1].value(assignment)
+    template = '{0} and {1}'
+    bitwise_template = '{0} & {1}'
+    opcode = AND
+
+    def __new__(cls, sexp1, sexp2):
+        return super().__new__(cls, '∧', sexp1, sexp2)
+
+    @staticmethod
+    def combine(value1, value2):
+        return value1 and value2
 
 
 class Disj(Exp):
     """Logical or."""
 
-    def __init__(self, sexp1, sexp2):
-        super().__init__('v', sexp1, sexp2)
+    __slots__ = ()
 
-    def value(self, assignment):
-        assert len(self.sexps) == 2
-        return \
-            self.sexps[0].value(assignment) or self.sexps[1].value(assignment)
+    template = '{0} or {1}'
+    bitwise_template = '{0} | {1}'
+    opcode = OR
+
+    def __new__(cls, sexp1, sexp2):
+        return super().__new__(cls, 'v', sexp1, sexp2)
+
+    @staticmethod
+    def combine(value1, value2):
+        return value1 or value2
 
 
 class Impl(Exp):
     """Logical implication."""
 
-    def __init__(self, sexp1, sexp2):
-        super().__init__('->', sexp1, sexp2)
+    __slots__ = ()
 
-    def value(self, assignment):
-        assert len(self.sexps) == 2
-        return \
-            (self.sexps[0].value(assignment) and self.sexps[1].value(assignment)) or \
-            (self.sexps[1].value(assignment) and not self.sexps[0].value(assignment)) or \
-            (not self.sexps[1].value(assignment) and not self.sexps[0].value(assignment))
+    template = 'not {0} or {1}'
+    bitwise_template = '~{0} | {1}'
+    opcode = IMPLIES
+
+    def __new__(cls, sexp1, sexp2):
+        return super().__new__(cls, '->', sexp1, sexp2)
+
+    @staticmethod
+    def combine(value1, value2):
+        return not value1 or value2
 
 
 class Equi(Exp):
     """Logical equivalence."""
 
-    def __init__(self, sexp1, sexp2):
-        super().__init__('<->', sexp1, sexp2)
+    __slots__ = ()
 
-    def value(self, assignment):
-        assert len(self.sexps) == 2
-        return \
-            (self.sexps[0].value(assignment) == self.sexps[1].value(assignment))
+    template = '{0} == {1}'
+    bitwise_template = '~({0} ^ {1})'
+    opcode = IFF
+
+    def __new__(cls, sexp1, sexp2):
+        return super().__new__(cls, '<->', sexp1, sexp2)
+
+    @staticmethod
+    def combine(value1, value2):
+        return value1 == value2
+
+
+def postorder(exp):
+    """Yields the distinct subexpressions of the specified expression.
+
+    Every subexpression is yielded after its own subexpressions, and
+    subexpressions that occur several times are yielded
+    only once. The traversal uses an explicit stack, so that very deep
+    expressions do not exhaust the Python call stack.
+
+    Args:
+        exp: A Boolean expression.
+
+    Yields:
+        The subexpressions of the expression, including the expression
+        itself as the last element.
+    """
+    done = set()
+    stack = [(exp, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in done:
+            continue
+        if expanded or not node.sexps:
+            done.add(id(node))
+            yield node
+            continue
+        stack.append((node, True))
+        for sexp in reversed(node.sexps):
+            if id(sexp) not in done:
+                stack.append((sexp, False))
+
+
+# Tokens of the infix syntax: the reserved symbols of the connectives and
+# parentheses, or a word (a variable name, or `v` for logical or).
+TOKEN = re.compile(r'\s*(?:(<->|->|-\||∧|\(|\))|(\w+))')
+
+# Precedence, class and left associativity of the binary connectives.
+BINARY = {
+    '<->': (1, Equi, True),
+    '->': (2, Impl, False),
+    'v': (3, Disj, True),
+    '∧': (4, Conj, True),
+}
+
+
+def postfix(exp):
+    """Returns a flat representation of the specified expression.
+
+    The representation is a list with one entry per distinct subexpression,
+    in `postorder`. The entry for a variable is a pair of the class `Var`
+    and the name of the variable; the entry for any other expression is a
+    tuple of its class and the positions of the entries of its
+    subexpressions. Expressions are pickled in this form, so that deep
+    expressions can be sent to other processes without recursion and
+    shared subexpressions are sent only once.
+
+    Args:
+        exp: A Boolean expression.
+
+    Returns:
+        The list of entries; the last entry is the expression itself.
+    """
+    position = {}
+    program = []
+    for node in postorder(exp):
+        if isinstance(node, Var):
+            program.append((Var, node.sym))
+        else:
+            program.append((type(node),) + tuple(position[sexp] for sexp in node.sexps))
+        position[node] = len(program) - 1
+    return program
+
+
+def from_postfix(program):
+    """Returns the expression represented by the specified `postfix` list."""
+    built = []
+    for entry in program:
+        if entry[0] is Var:
+            built.append(Var(entry[1]))
+        else:
+            built.append(entry[0](*[built[i] for i in entry[1:]]))
+    return built[-1]
+
+
+# The constants, indexed by their reserved symbols.
+CONSTANTS = {'1': Verum, '0': Falsum}
+
+
+def parse(text):
+    """Parses an expression in infix notation.
+
+    The syntax uses the reserved symbols of the expression classes: `-|`
+    for logical not, `∧` for logical and, `v` for logical or, `->` for
+    logical implication and `<->` for logical equivalence, in order of
+    decreasing precedence. Implication associates to the right, the other
+    binary connectives to the left. The constants are written `1` and `0`.
+    Variable names are words made up of letters, digits and underscores,
+    except for the words `v`, `1` and `0`.
+    Example: `-|(p ∧ q) <-> -|p v -|q`
+
+    The parser is an operator-precedence (shunting-yard) parser and does not
+    recurse, so there is no limit on the nesting depth.
+
+    Args:
+        text: A string.
+
+    Returns:
+        The expression represented by the string.
+
+    Raises:
+        ValueError: If the string is not a well-formed expression.
+    """
+    operands = []
+    operators = []
+
+    def reduce():
+        sym = operators.pop()
+        if sym == '-|':
+            operands.append(Nega(operands.pop()))
+        else:
+            sexp2 = operands.pop()
+            sexp1 = operands.pop()
+            operands.append(BINARY[sym][1](sexp1, sexp2))
+
+    expect_operand = True
+    pos = 0
+    while True:
+        match = TOKEN.match(text, pos)
+        if match is None:
+            break
+        sym, word = match.groups()
+        if word == 'v':
+            sym = word
+        if expect_operand:
+            if word is not None and sym is None:
+                operands.append(CONSTANTS[word]() if word in CONSTANTS else Var(word))
+                expect_operand = False
+            elif sym in ('-|', '('):
+                operators.append(sym)
+            else:
+                raise ValueError("expected an operand at position {}".format(match.start(1) if word is None else match.start(2)))
+        elif sym == ')':
+            while operators and operators[-1] != '(':
+                reduce()
+            if not operators:
+                raise ValueError("unbalanced ')' at position {}".format(match.start(1)))
+            operators.pop()
+        elif sym in BINARY:
+            precedence, _, left = BINARY[sym]
+            while operators and operators[-1] != '(' and (
+                    operators[-1] == '-|' or
+                    BINARY[operators[-1]][0] > precedence or
+                    BINARY[operators[-1]][0] == precedence and left):
+                reduce()
+            operators.append(sym)
+            expect_operand = True
+        else:
+            raise ValueError("expected a connective at position {}".format(match.start(1) if word is None else match.start(2)))
+        pos = match.end()
+    if text[pos:].strip():
+        raise ValueError("unexpected character at position {}".format(len(text) - len(text[pos:].lstrip())))
+    if expect_operand:
+        raise ValueError("unexpected end of expression")
+    while operators:
+        if operators[-1] == '(':
+            raise ValueError("unbalanced '('")
+        reduce()
+    return operands[0]
+
+
+def parse_lines(lines):
+    """Yields the expressions in a sequence of lines, such as a file, one
+    expression per non-empty line (see `parse`)."""
+    for line in lines:
+        if line.strip():
+            yield parse(line)
+
+
+def simplify(exp):
+    """Returns a simplified expression that is equivalent to the specified
+    expression.
+
+    The expression is rewritten bottom-up, without recursion, by the
+    following rules (and their mirror images):
+
+        -|1 = 0, -|0 = 1, -|-|a = a
+        a ∧ 1 = a, a ∧ 0 = 0, a ∧ a = a, a ∧ -|a = 0, a ∧ (a v b) = a
+        a v 0 = a, a v 1 = 1, a v a = a, a v -|a = 1, a v (a ∧ b) = a
+        a -> b = -|a v b
+        a <-> 1 = a, a <-> 0 = -|a, a <-> a = 1, a <-> -|a = 0
+
+    Only the variables of the specified expression occur in the result, but
+    some of them may have disappeared.
+
+    Args:
+        exp: A Boolean expression.
+
+    Returns:
+        The simplified expression.
+    """
+    simplified = {}
+    for node in postorder(exp):
+        sexps = [simplified[sexp] for sexp in node.sexps]
+        simplified[node] = _simplify(type(node), sexps) if sexps else node
+    return simplified[exp]
+
+
+def _simplify(cls, sexps):
+    true = Verum()
+    false = Falsum()
+    if cls is Nega:
+        a, = sexps
+        if a is true:
+            return false
+        if a is false:
+            return true
+        if isinstance(a, Nega):
+            return a.sexps[0]
+        return Nega(a)
+    a, b = sexps
+    if cls is Impl:
+        return _simplify(Disj, [_simplify(Nega, [a]), b])
+    if cls is Equi:
+        for x, y in ((a, b), (b, a)):
+            if x is true:
+                return y
+            if x is false:
+                return _simplify(Nega, [y])
+        if a is b:
+            return true
+        if a is _simplify(Nega, [b]):
+            return false
+        return Equi(a, b)
+    unit, zero, dual = (true, false, Disj) if cls is Conj else (false, true, Conj)
+    for x, y in ((a, b), (b, a)):
+        if x is unit:
+            return y
+        if x is zero:
+            return zero
+        if isinstance(y, dual) and x in y.sexps:
+            return x
+    if a is b:
+        return a
+    if a is _simplify(Nega, [b]):
+        return zero
+    return cls(a, b)
 
 
 def assignments(variables):
@@ -149,14 +624,1324 @@ def assignments(variables):
         yield dict(zip(variables, combination))
 
 
-def satisfiable(exp):
+class Tseitin(object):
+    """Translates Boolean expressions into an equisatisfiable set of clauses.
+
+    Each variable of an expression and each compound subexpression gets an
+    integer index, numbered from 1. The constants are represented by an
+    index that is fixed to true by a unit clause. Clauses are lists of non-zero integers
+    in the DIMACS convention: the index `v` stands for the variable and
+    `-v` for its negation. Negations do not introduce new indices; they
+    simply flip the sign of the literal of their subexpression.
+
+    Subexpressions that occur several times in an expression, or in
+    several expressions encoded by the same translator, are encoded only
+    once.
+
+    Attributes:
+        names: A dictionary that maps variable names to their indices.
+        nvars: The number of indices handed out so far.
+        clauses: The list of clauses produced so far (only used when no
+            sink is specified).
+    """
+
+    def __init__(self, sink=None):
+        """Constructs a new translator.
+
+        Args:
+            sink: A function that is called with each new clause. If no
+                sink is specified, the clauses are collected in `clauses`.
+        """
+        self.names = {}
+        self.nvars = 0
+        self.clauses = []
+        self.sink = self.clauses.append if sink is None else sink
+        self.cache = {}
+        self.true = None
+
+    def new_var(self):
+        """Returns a fresh index."""
+        self.nvars += 1
+        return self.nvars
+
+    def encode(self, exp):
+        """Returns the literal that stands for the specified expression.
+
+        The subexpressions are visited in `postorder`, so that very deep
+        expressions do not exhaust the Python call stack.
+
+        Args:
+            exp: A Boolean expression.
+
+        Returns:
+            A literal that is true in a model of the produced clauses if and
+            only if the specified expression is true under the truth
+            assignment given by that model.
+        """
+        cache = self.cache
+        sink = self.sink
+        for node in postorder(exp):
+            if node in cache:
+                continue
+            if isinstance(node, Var):
+                if node.sym not in self.names:
+                    self.names[node.sym] = self.new_var()
+                cache[node] = self.names[node.sym]
+                continue
+            if isinstance(node, Verum) or isinstance(node, Falsum):
+                if self.true is None:
+                    self.true = self.new_var()
+                    sink([self.true])
+                cache[node] = self.true if isinstance(node, Verum) else -self.true
+                continue
+            lits = [cache[sexp] for sexp in node.sexps]
+            if isinstance(node, Nega):
+                cache[node] = -lits[0]
+                continue
+            a, b = lits
+            x = self.new_var()
+            if isinstance(node, Conj):
+                sink([-x, a])
+                sink([-x, b])
+                sink([x, -a, -b])
+            elif isinstance(node, Disj) or isinstance(node, Impl):
+                if isinstance(node, Impl):
+                    a = -a
+                sink([-x, a, b])
+                sink([x, -a])
+                sink([x, -b])
+            elif isinstance(node, Equi):
+                sink([-x, -a, b])
+                sink([-x, a, -b])
+                sink([x, a, b])
+                sink([x, -a, -b])
+            else:
+                raise ValueError()
+            cache[node] = x
+        return cache[exp]
+
+
+def write_dimacs(exp, file):
+    """Writes the `Tseitin` encoding of the specified expression in the
+    DIMACS CNF format.
+
+    The variables of the expression get the indices 1, 2, ... in sorted
+    order; each one is recorded in a comment line `c var <index> <name>`.
+    The clauses are written as they are produced, so apart from the
+    expression itself only the map from subexpressions to indices is held
+    in memory.
+
+    Args:
+        exp: A Boolean expression.
+        file: A text file opened for writing.
+
+    Returns:
+        A dictionary that maps variable names to their indices.
+    """
+    def write(clause):
+        file.write(" ".join(map(str, clause)) + " 0\n")
+
+    encoder = Tseitin(write)
+    for name in sorted(exp.variables()):
+        encoder.names[name] = encoder.new_var()
+        file.write("c var {} {}\n".format(encoder.nvars, name))
+    nvars = encoder.nvars
+    nclauses = 1
+    constant = False
+    for node in postorder(exp):
+        if len(node.sexps) == 2:
+            nvars += 1
+            nclauses += 4 if isinstance(node, Equi) else 3
+        elif isinstance(node, Verum) or isinstance(node, Falsum):
+            constant = True
+    nvars += constant
+    nclauses += constant
+    file.write("p cnf {} {}\n".format(nvars, nclauses))
+    write([encoder.encode(exp)])
+    return encoder.names
+
+
+def read_dimacs(lines, names=None):
+    """Yields the clauses of a formula in the DIMACS CNF format.
+
+    The input is processed line by line, so arbitrarily large files can be
+    streamed into, for example, `CDCL.add_clause`.
+
+    Args:
+        lines: A sequence of lines, such as a text file.
+        names: An optional dictionary that is filled with the variable
+            names recorded by `write_dimacs`, mapping indices to names.
+
+    Yields:
+        The clauses, as lists of DIMACS literals.
+    """
+    clause = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] == 'c':
+            fields = line.split()
+            if names is not None and len(fields) == 4 and fields[1] == 'var':
+                names[int(fields[2])] = fields[3]
+            continue
+        if line[0] == 'p':
+            continue
+        if line[0] == '%':
+            break
+        for field in line.split():
+            lit = int(field)
+            if lit == 0:
+                yield clause
+                clause = []
+            else:
+                clause.append(lit)
+    if clause:
+        yield clause
+
+
+def cnf_exp(clauses, names=None):
+    """Returns the conjunction of the specified clauses as an expression.
+
+    The conjunction is built as a balanced tree while the clauses are
+    consumed, so its depth grows only logarithmically with the number of
+    clauses.
+
+    Args:
+        clauses: An iterable of clauses, as lists of DIMACS literals. An
+            empty clause stands for false.
+        names: An optional dictionary that maps indices to variable names.
+            Other indices `i` get the name `x<i>`.
+
+    Returns:
+        A Boolean expression; `Verum()` if there are no clauses.
+    """
+    if names is None:
+        names = {}
+    partial = []
+    for clause in clauses:
+        exp = None if clause else Falsum()
+        for lit in clause:
+            name = names.get(abs(lit)) or "x{}".format(abs(lit))
+            literal = Var(name) if lit > 0 else Nega(Var(name))
+            exp = literal if exp is None else Disj(exp, literal)
+        size = 1
+        while partial and partial[-1][1] == size:
+            exp = Conj(partial.pop()[0], exp)
+            size *= 2
+        partial.append((exp, size))
+    if not partial:
+        return Verum()
+    exp = partial.pop()[0]
+    while partial:
+        exp = Conj(partial.pop()[0], exp)
+    return exp
+
+
+def luby(i):
+    """Returns the *i*th element (counting from 0) of the Luby sequence
+    1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i = i % size
+    return 1 << seq
+
+
+class CDCL(object):
+    """A conflict-driven clause learning SAT solver.
+
+    The solver works on clauses in the DIMACS convention (see `Tseitin`).
+    It implements the usual ingredients of a modern SAT solver: unit
+    propagation with two watched literals per clause, learning of
+    first-UIP conflict clauses with non-chronological backtracking,
+    activity-based (VSIDS) branching with phase saving, and restarts that
+    follow the Luby sequence.
+
+    Internally, the literal `v` is represented by the code `2 * v` and the
+    literal `-v` by the code `2 * v + 1`, so that negation is `code ^ 1`
+    and all per-literal data can be kept in plain lists.
+
+    Attributes:
+        nvars: The number of variables known to the solver.
+        model: After a successful call to `solve`, a list that maps each
+            variable (from 1 to `nvars`) to its truth value; index 0 is
+            unused. Otherwise `None`.
+        conflicts: The total number of conflicts encountered.
+    """
+
+    restart_base = 100
+    var_decay = 0.95
+
+    def __init__(self):
+        """Constructs a new solver without any variables or clauses."""
+        self.nvars = 0
+        self.ok = True
+        self.clauses = []
+        self.learnts = []
+        self.watches = [[], []]
+        self.values = [0, 0]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.polarity = [False]
+        self.seen = [False]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.heap = []
+        self.var_inc = 1.0
+        self.conflicts = 0
+        self.model = None
+
+    def new_var(self):
+        """Adds a fresh variable to the solver and returns its index."""
+        self.nvars += 1
+        self.watches += [[], []]
+        self.values += [0, 0]
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.polarity.append(False)
+        self.seen.append(False)
+        heapq.heappush(self.heap, (0.0, self.nvars))
+        return self.nvars
+
+    def add_clause(self, lits):
+        """Adds a clause to the solver.
+
+        Args:
+            lits: An iterable of DIMACS literals. Variables that the solver
+                has not seen yet are added on the fly.
+
+        Returns:
+            False if the solver has become trivially unsatisfiable,
+            True otherwise.
+        """
+        if not self.ok:
+            return False
+        values = self.values
+        clause = []
+        for lit in lits:
+            v = abs(lit)
+            while self.nvars < v:
+                self.new_var()
+            code = 2 * v + (lit < 0)
+            if values[code] == 1 or code ^ 1 in clause:
+                return True
+            if values[code] == 0 and code not in clause:
+                clause.append(code)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self._attach(clause)
+            self.clauses.append(clause)
+        return self.ok
+
+    def solve(self, assumptions=()):
+        """Searches for a model of the clauses added so far.
+
+        The solver can be called repeatedly, with clauses added in between;
+        learned clauses and variable activities are kept from one call to
+        the next.
+
+        Args:
+            assumptions: A sequence of DIMACS literals that must be true in
+                the model. They hold only for this call.
+
+        Returns:
+            True if the clauses are satisfiable together with the
+            assumptions (the model is then stored in `model`), False
+            otherwise.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        if self._propagate() is not None:
+            self.ok = False
+            return False
+        codes = []
+        for lit in assumptions:
+            while self.nvars < abs(lit):
+                self.new_var()
+            codes.append(2 * abs(lit) + (lit < 0))
+        restarts = 0
+        while True:
+            status = self._search(self.restart_base * luby(restarts), codes)
+            if status is not None:
+                break
+            restarts += 1
+        self._backtrack(0)
+        return status
+
+    def _search(self, budget, assumptions):
+        conflicts = 0
+        while True:
+            confl = self._propagate()
+            if confl is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, level = self._analyze(confl)
+                self._backtrack(level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self._attach(learnt)
+                    self.learnts.append(learnt)
+                    self._assign(learnt[0], learnt)
+                self.var_inc /= self.var_decay
+                continue
+            if conflicts >= budget:
+                self._backtrack(0)
+                return None
+            code = None
+            while len(self.trail_lim) < len(assumptions):
+                assumption = assumptions[len(self.trail_lim)]
+                if self.values[assumption] == 1:
+                    self.trail_lim.append(len(self.trail))
+                elif self.values[assumption] == -1:
+                    self._backtrack(0)
+                    return False
+                else:
+                    code = assumption
+                    break
+            if code is None:
+                code = self._pick_branch()
+            if code is None:
+                values = self.values
+                self.model = [False] + \
+                    [values[2 * v] == 1 for v in range(1, self.nvars + 1)]
+                return True
+            self.trail_lim.append(len(self.trail))
+            self._assign(code, None)
+
+    def _attach(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def _assign(self, code, reason):
+        v = code >> 1
+        self.values[code] = 1
+        self.values[code ^ 1] = -1
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(code)
+
+    def _propagate(self):
+        """Propagates all pending assignments. Returns a conflicting clause,
+        or None if no conflict arises."""
+        values = self.values
+        watches = self.watches
+        trail = self.trail
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            ws = watches[false_lit]
+            i = j = 0
+            n = len(ws)
+            while i < n:
+                c = ws[i]
+                i += 1
+                if c[0] == false_lit:
+                    c[0], c[1] = c[1], false_lit
+                first = c[0]
+                if values[first] == 1:
+                    ws[j] = c
+                    j += 1
+                    continue
+                for k in range(2, len(c)):
+                    if values[c[k]] != -1:
+                        c[1], c[k] = c[k], false_lit
+                        watches[c[1]].append(c)
+                        break
+                else:
+                    ws[j] = c
+                    j += 1
+                    if values[first] == -1:
+                        while i < n:
+                            ws[j] = ws[i]
+                            j += 1
+                            i += 1
+                        del ws[j:]
+                        self.qhead = len(trail)
+                        return c
+                    self._assign(first, c)
+            del ws[j:]
+        return None
+
+    def _analyze(self, confl):
+        """Derives a first-UIP clause from a conflict. Returns the clause,
+        with the asserting literal first, and the backtrack level."""
+        seen = self.seen
+        level = self.level
+        trail = self.trail
+        current = len(self.trail_lim)
+        learnt = [None]
+        counter = 0
+        code = None
+        index = len(trail) - 1
+        while True:
+            for q in (confl if code is None else confl[1:]):
+                v = q >> 1
+                if not seen[v] and level[v] > 0:
+                    seen[v] = True
+                    self._bump(v)
+                    if level[v] >= current:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            code = trail[index]
+            index -= 1
+            seen[code >> 1] = False
+            counter -= 1
+            if counter == 0:
+                break
+            confl = self.reason[code >> 1]
+        learnt[0] = code ^ 1
+        for q in learnt[1:]:
+            seen[q >> 1] = False
+        if len(learnt) == 1:
+            return learnt, 0
+        best = 1
+        for i in range(2, len(learnt)):
+            if level[learnt[i] >> 1] > level[learnt[best] >> 1]:
+                best = i
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+
+    def _backtrack(self, target):
+        if len(self.trail_lim) <= target:
+            return
+        values = self.values
+        start = self.trail_lim[target]
+        for code in self.trail[start:]:
+            v = code >> 1
+            values[code] = values[code ^ 1] = 0
+            self.reason[v] = None
+            self.polarity[v] = not code & 1
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[target:]
+        self.qhead = start
+        if len(self.heap) > 4 * self.nvars + 64:
+            self._rebuild_heap()
+
+    def _bump(self, v):
+        self.activity[v] += self.var_inc
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        values = self.values
+        self.heap = [(-self.activity[v], v)
+                     for v in range(1, self.nvars + 1) if values[2 * v] == 0]
+        heapq.heapify(self.heap)
+
+    def _pick_branch(self):
+        values = self.values
+        while self.heap:
+            _, v = heapq.heappop(self.heap)
+            if values[2 * v] == 0:
+                return 2 * v + (not self.polarity[v])
+        return None
+
+
+class BDD(object):
+    """A manager for reduced ordered binary decision diagrams (ROBDDs).
+
+    Nodes are represented by integers: 0 and 1 are the terminal nodes for
+    false and true, and every other integer indexes an internal node that
+    tests a variable and has a low child (the variable is false) and a
+    high child (the variable is true). The unique table guarantees that
+    there is at most one node for each triple of variable and children, so
+    two expressions are equivalent if and only if they are represented by
+    the same node.
+
+    Results of `apply` are memoised in a computed table that holds at most
+    `cache_size` entries; the oldest entries are evicted first.
+
+    Attributes:
+        order: The variable order, as a list of variable names. Variables
+            that are not in the order yet are appended when first used.
+        nodes: A list that maps each node to a triple of the level of its
+            variable in the order and its low and high child.
+    """
+
+    operators = {
+        '∧': lambda a, b: a and b,
+        'v': lambda a, b: a or b,
+        '->': lambda a, b: not a or b,
+        '<->': lambda a, b: a == b,
+    }
+
+    def __init__(self, order=(), cache_size=1 << 18):
+        """Constructs a new manager.
+
+        Args:
+            order: An initial variable order, as a sequence of names.
+            cache_size: The maximal number of entries in the computed table.
+        """
+        self.order = []
+        self.level_of = {}
+        self.nodes = [(None, None, None), (None, None, None)]
+        self.unique = {}
+        self.cache = {}
+        self.cache_size = cache_size
+        for name in order:
+            self.level(name)
+
+    def level(self, name):
+        """Returns the level of the specified variable in the order."""
+        if name not in self.level_of:
+            self.level_of[name] = len(self.order)
+            self.order.append(name)
+        return self.level_of[name]
+
+    def mk(self, level, low, high):
+        """Returns the node that tests the variable at the specified level
+        and has the specified children."""
+        if low == high:
+            return low
+        key = (level, low, high)
+        u = self.unique.get(key)
+        if u is None:
+            u = len(self.nodes)
+            self.nodes.append(key)
+            self.unique[key] = u
+        return u
+
+    def var(self, name):
+        """Returns the node for the variable with the specified name."""
+        return self.mk(self.level(name), 0, 1)
+
+    def _top(self, u):
+        return len(self.order) if u <= 1 else self.nodes[u][0]
+
+    def _remember(self, key, u):
+        cache = self.cache
+        cache[key] = u
+        if len(cache) > self.cache_size:
+            # Collect the oldest keys in one pass; restarting iteration at
+            # the front after every deletion would be quadratic.
+            for key in list(itertools.islice(cache, len(cache) // 4)):
+                del cache[key]
+        return u
+
+    def negate(self, u):
+        """Returns the node for the negation of the node *u*."""
+        if u <= 1:
+            return 1 - u
+        # Bottom-up with an explicit stack, so that long paths do not
+        # exhaust the Python call stack. The results of this call are kept
+        # apart from the computed table, which may evict them meanwhile.
+        results = {0: 1, 1: 0}
+        stack = [u]
+        while stack:
+            w = stack[-1]
+            if w in results:
+                stack.pop()
+                continue
+            key = ('-|', w)
+            if key in self.cache:
+                results[w] = self.cache[key]
+                stack.pop()
+                continue
+            level, low, high = self.nodes[w]
+            if low in results and high in results:
+                stack.pop()
+                results[w] = self._remember(key, self.mk(level, results[low], results[high]))
+            else:
+                stack.extend(x for x in (low, high) if x not in results)
+        return results[u]
+
+    def _shortcut(self, sym, u, v):
+        """Returns the node for `apply(sym, u, v)` if it follows from the
+        terminal cases or the computed table, and None otherwise."""
+        if u <= 1 and v <= 1:
+            return int(self.operators[sym](u == 1, v == 1))
+        if sym == '∧':
+            if u == 0 or v == 0:
+                return 0
+            if u == 1 or u == v:
+                return v
+            if v == 1:
+                return u
+        elif sym == 'v':
+            if u == 1 or v == 1:
+                return 1
+            if u == 0 or u == v:
+                return v
+            if v == 0:
+                return u
+        elif u == v:
+            return 1
+        return self.cache.get((sym, u, v))
+
+    def apply(self, sym, u, v):
+        """Returns the node for the combination of the nodes *u* and *v*
+        with the binary connective that has the reserved symbol *sym*."""
+        # Bottom-up with an explicit stack, as in `negate`.
+        results = {}
+        stack = [(u, v)]
+        while stack:
+            pair = stack[-1]
+            if pair in results:
+                stack.pop()
+                continue
+            w = self._shortcut(sym, *pair)
+            if w is not None:
+                results[pair] = w
+                stack.pop()
+                continue
+            a, b = pair
+            top_a = self._top(a)
+            top_b = self._top(b)
+            level = min(top_a, top_b)
+            a0, a1 = self.nodes[a][1:] if top_a == level else (a, a)
+            b0, b1 = self.nodes[b][1:] if top_b == level else (b, b)
+            low, high = (a0, b0), (a1, b1)
+            if low in results and high in results:
+                stack.pop()
+                results[pair] = self._remember(
+                    (sym, a, b), self.mk(level, results[low], results[high]))
+            else:
+                stack.extend(x for x in (low, high) if x not in results)
+        return results[(u, v)]
+
+    def build(self, exp):
+        """Returns the node that represents the specified expression."""
+        built = {}
+        for node in postorder(exp):
+            if isinstance(node, Var):
+                u = self.var(node.sym)
+            elif isinstance(node, Verum):
+                u = 1
+            elif isinstance(node, Falsum):
+                u = 0
+            elif isinstance(node, Nega):
+                u = self.negate(built[id(node.sexps[0])])
+            else:
+                u = self.apply(node.sym, built[id(node.sexps[0])], built[id(node.sexps[1])])
+            built[id(node)] = u
+        return built[id(exp)]
+
+    def satisfy(self, u):
+        """Returns a truth assignment under which the node *u* is true, or
+        False if there is none. Variables that do not occur on the chosen
+        path are left out of the assignment."""
+        if u == 0:
+            return False
+        assignment = {}
+        while u > 1:
+            level, low, high = self.nodes[u]
+            value = low == 0
+            assignment[self.order[level]] = value
+            u = high if value else low
+        return assignment
+
+    def count(self, u, nvars=None):
+        """Returns the number of truth assignments to the first *nvars*
+        variables of the order (all variables by default) under which the
+        node *u* is true. The variables of *u* must be among them."""
+        if nvars is None:
+            nvars = len(self.order)
+        counts = {0: 0, 1: 1}
+        stack = [u]
+        while stack:
+            w = stack[-1]
+            if w in counts:
+                stack.pop()
+                continue
+            level, low, high = self.nodes[w]
+            if low in counts and high in counts:
+                stack.pop()
+                counts[w] = \
+                    (counts[low] << (self._top(low) - level - 1)) + \
+                    (counts[high] << (self._top(high) - level - 1))
+            else:
+                stack.extend(x for x in (low, high) if x not in counts)
+        total = counts[u] << self._top(u)
+        return total >> (len(self.order) - nvars)
+
+    def size(self, roots):
+        """Returns the number of internal nodes reachable from the specified
+        nodes."""
+        seen = set()
+        stack = [u for u in roots if u > 1]
+        while stack:
+            u = stack.pop()
+            if u not in seen:
+                seen.add(u)
+                stack.extend(x for x in self.nodes[u][1:] if x > 1)
+        return len(seen)
+
+    def _copy(self, order, roots):
+        other = BDD(order, self.cache_size)
+        copied = {0: 0, 1: 1}
+        stack = list(roots)
+        while stack:
+            u = stack[-1]
+            if u in copied:
+                stack.pop()
+                continue
+            level, low, high = self.nodes[u]
+            if low in copied and high in copied:
+                stack.pop()
+                x = other.var(self.order[level])
+                copied[u] = other.apply('v',
+                                        other.apply('∧', x, copied[high]),
+                                        other.apply('∧', other.negate(x), copied[low]))
+            else:
+                stack.extend(w for w in (low, high) if w not in copied)
+        return other, [copied[u] for u in roots]
+
+    def reorder(self, roots, order):
+        """Rebuilds the diagrams under a new variable order.
+
+        All nodes other than the specified roots become invalid.
+
+        Args:
+            roots: A list of nodes to keep.
+            order: The new variable order; it must contain every variable
+                of the current order.
+
+        Returns:
+            The list of nodes that represent the roots under the new order.
+        """
+        other, roots = self._copy(order, roots)
+        self.order = other.order
+        self.level_of = other.level_of
+        self.nodes = other.nodes
+        self.unique = other.unique
+        self.cache = other.cache
+        return roots
+
+    def sift(self, roots):
+        """Improves the variable order by sifting: every variable in turn is
+        tried at every position of the order and left at the position that
+        gives the fewest nodes. Since each trial rebuilds the diagrams, this
+        is worthwhile only for diagrams that are used many times.
+
+        Args:
+            roots: A list of nodes to keep.
+
+        Returns:
+            The list of nodes that represent the roots under the new order.
+        """
+        best = self.size(roots)
+        for name in list(self.order):
+            rest = [x for x in self.order if x != name]
+            best_order = None
+            for position in range(len(self.order)):
+                order = rest[:position] + [name] + rest[position:]
+                if order == self.order:
+                    continue
+                other, other_roots = self._copy(order, roots)
+                size = other.size(other_roots)
+                if size < best:
+                    best, best_order = size, order
+            if best_order is not None:
+                roots = self.reorder(roots, best_order)
+        return roots
+
+
+class ModelCounter(object):
+    """Counts the models of a set of clauses (#SAT).
+
+    The counter splits on variables like DPLL, with unit propagation after
+    each split, and decomposes the clauses into components that share no
+    variables; the count of a set of clauses is the product of the counts
+    of its components. The count of every component is cached, keyed on
+    its (sorted) clauses, so that a component that turns up under several
+    partial assignments is counted only once. The cache is bounded by the
+    total number of literals in its keys; once it grows past
+    `cache_limit`, the oldest entries are evicted.
+
+    Counting can be projected onto a subset of the variables: then two
+    models that agree on that subset are counted once. The splitting
+    branches on projected variables first, and a component without
+    projected variables counts 1 if it is satisfiable and 0 otherwise.
+
+    Attributes:
+        cache_limit: The maximal number of literals in the cache.
+        hits: The number of components found in the cache.
+    """
+
+    def __init__(self, cache_limit=1 << 22):
+        """Constructs a new counter with an empty cache.
+
+        Args:
+            cache_limit: The maximal number of literals in the cache.
+        """
+        self.cache_limit = cache_limit
+        self.cache = {}
+        self.cache_literals = 0
+        self.hits = 0
+        self.projection = None
+
+    def count(self, clauses, projection=None):
+        """Returns the number of models of the specified clauses.
+
+        Args:
+            clauses: An iterable of clauses, as lists of DIMACS literals.
+            projection: The set of variables (indices) to count models
+                over. Defaults to the variables of the clauses.
+
+        Returns:
+            The number of truth assignments to the projection variables
+            that can be extended to a model of the clauses.
+        """
+        clauses = [tuple(clause) for clause in clauses]
+        variables = {abs(lit) for clause in clauses for lit in clause}
+        if projection is None:
+            projection = variables
+        projection = set(projection)
+        if projection != self.projection:
+            # Cached counts are only valid for the projection that they
+            # were computed for.
+            self.cache.clear()
+            self.cache_literals = 0
+            self.projection = projection
+        simplified = self._propagate(clauses, ())
+        if simplified is None:
+            return 0
+        clauses, assigned = simplified
+        remaining = {abs(lit) for clause in clauses for lit in clause}
+        free = len(self.projection - remaining - assigned)
+        return self._count(clauses) << free
+
+    def _count(self, clauses):
+        if not clauses:
+            return 1
+        if clauses in self.cache:
+            self.hits += 1
+            return self.cache[clauses]
+        components = self._components(clauses)
+        if len(components) > 1:
+            result = 1
+            for component in components:
+                result *= self._count(component)
+                if result == 0:
+                    break
+        else:
+            occurrences = {}
+            for clause in clauses:
+                for lit in clause:
+                    occurrences[abs(lit)] = occurrences.get(abs(lit), 0) + 1
+            projected = [v for v in occurrences if v in self.projection]
+            v = max(projected or occurrences, key=occurrences.get)
+            result = 0
+            for lit in (v, -v):
+                simplified = self._propagate(clauses, (lit,))
+                if simplified is None:
+                    continue
+                sub, assigned = simplified
+                remaining = {abs(x) for clause in sub for x in clause}
+                free = len([u for u in projected if u not in remaining and u not in assigned])
+                n = self._count(sub) << free
+                if not projected and n:
+                    result = 1
+                    break
+                result += n
+        self._remember(clauses, result)
+        return result
+
+    def _remember(self, clauses, result):
+        cache = self.cache
+        cache[clauses] = result
+        self.cache_literals += sum(map(len, clauses))
+        if self.cache_literals > self.cache_limit:
+            # Collect the oldest keys in one pass (see `BDD._remember`).
+            evicted = []
+            for key in cache:
+                if self.cache_literals <= 3 * self.cache_limit // 4:
+                    break
+                evicted.append(key)
+                self.cache_literals -= sum(map(len, key))
+            for key in evicted:
+                del cache[key]
+
+    def _propagate(self, clauses, lits):
+        """Assigns the specified literals and propagates units. Returns the
+        remaining clauses as a sorted tuple of sorted tuples and the set of
+        assigned variables, or None if a clause becomes false."""
+        # Each clause counts its literals that are not yet false; only the
+        # clauses with a newly falsified literal are visited, through the
+        # occurrence lists, so propagation is linear in the clauses.
+        occurrences = {}
+        for i, clause in enumerate(clauses):
+            for lit in clause:
+                occurrences.setdefault(lit, []).append(i)
+        remaining = [len(clause) for clause in clauses]
+        satisfied = [False] * len(clauses)
+        true = set()
+        pending = []
+
+        def assign(lit):
+            if -lit in true:
+                return False
+            if lit not in true:
+                true.add(lit)
+                pending.append(lit)
+            return True
+
+        for lit in lits:
+            if not assign(lit):
+                return None
+        for clause in clauses:
+            if len(clause) == 1 and not assign(clause[0]):
+                return None
+        while pending:
+            lit = pending.pop()
+            for i in occurrences.get(lit, ()):
+                satisfied[i] = True
+            for i in occurrences.get(-lit, ()):
+                if satisfied[i]:
+                    continue
+                remaining[i] -= 1
+                if remaining[i] == 0:
+                    return None
+                if remaining[i] == 1:
+                    for unit in clauses[i]:
+                        if -unit not in true:
+                            if not assign(unit):
+                                return None
+                            break
+        result = set()
+        for i, clause in enumerate(clauses):
+            if not satisfied[i] and not any(lit in true for lit in clause):
+                result.add(tuple(sorted(lit for lit in clause if -lit not in true)))
+        return tuple(sorted(result)), {abs(lit) for lit in true}
+
+    def _components(self, clauses):
+        """Splits the clauses into sets that share no variables."""
+        by_var = {}
+        for i, clause in enumerate(clauses):
+            for lit in clause:
+                by_var.setdefault(abs(lit), []).append(i)
+        component_of = [None] * len(clauses)
+        components = []
+        for start in range(len(clauses)):
+            if component_of[start] is not None:
+                continue
+            component_of[start] = len(components)
+            members = [start]
+            stack = [start]
+            while stack:
+                i = stack.pop()
+                for lit in clauses[i]:
+                    for j in by_var[abs(lit)]:
+                        if component_of[j] is None:
+                            component_of[j] = len(components)
+                            members.append(j)
+                            stack.append(j)
+            components.append(tuple(sorted(clauses[i] for i in members)))
+        return components
+
+
+def count_models(exp, variables=None):
+    """Returns the number of models of the specified expression.
+
+    The expression is translated into clauses (see `Tseitin`) and counted
+    with a `ModelCounter`. Since the translation introduces one index per
+    compound subexpression, whose value is determined by the variables,
+    the count is projected onto the variables.
+
+    Args:
+        exp: A Boolean expression.
+        variables: The names of the variables to count truth assignments
+            over. Defaults to the variables of the expression. Variables
+            that do not occur in the expression double the count.
+
+    Returns:
+        The number of truth assignments to the variables that can be
+        extended to a truth assignment that makes the expression evaluate
+        to true.
+    """
+    if variables is None:
+        variables = exp.variables()
+    variables = set(variables)
+    encoder = Tseitin()
+    root = encoder.encode(simplify(exp))
+    projection = {encoder.names[name] for name in variables if name in encoder.names}
+    count = ModelCounter().count(encoder.clauses + [[root]], projection)
+    return count << len(variables) - len(projection)
+
+
+# The BDD manager used by `satisfiable`, `tautology` and `equivalent`. It is
+# shared between calls, so that batches of related queries share nodes;
+# it is replaced by a fresh manager once it holds `BDD_NODE_LIMIT` nodes.
+BDD_NODE_LIMIT = 1 << 20
+_bdd = None
+
+
+def bdd_manager():
+    """Returns the shared BDD manager."""
+    global _bdd
+    if _bdd is None or len(_bdd.nodes) > BDD_NODE_LIMIT:
+        _bdd = BDD()
+    return _bdd
+
+
+class Solver(object):
+    """An incremental satisfiability session.
+
+    Expressions are added as constraints one at a time and translated into
+    clauses for a single `CDCL` solver, so that the translation of shared
+    subexpressions, the learned clauses and the variable activities carry
+    over from one call of `solve` to the next.
+
+    Constraints can be grouped in scopes: `push` opens a scope and `pop`
+    retracts all constraints added since the matching `push`. Each scope
+    has an activation index; its constraints are added as clauses that
+    are switched off unless the activation index is true, the solver
+    assumes the activation indices of all open scopes, and popping a scope
+    switches its clauses off for good. Learned clauses that depend on a
+    scope mention its activation index and thus remain valid.
+
+    Example:
+
+        solver = Solver()
+        solver.add(parse("p -> q"))
+        solver.push()
+        solver.add(Var('p'))
+        solver.solve([Nega(Var('q'))])  # False
+        solver.pop()
+        solver.solve([Nega(Var('q'))])  # {'p': False, 'q': False}
+    """
+
+    def __init__(self):
+        """Constructs a new session without any constraints."""
+        self.cdcl = CDCL()
+        self.encoder = Tseitin(self.cdcl.add_clause)
+        self.scopes = []
+
+    def add(self, exp):
+        """Adds the specified expression as a constraint, in the innermost
+        open scope."""
+        lit = self.encoder.encode(exp)
+        if self.scopes:
+            self.cdcl.add_clause([lit, -self.scopes[-1]])
+        else:
+            self.cdcl.add_clause([lit])
+
+    def push(self):
+        """Opens a new scope."""
+        self.scopes.append(self.encoder.new_var())
+
+    def pop(self):
+        """Retracts the constraints of the innermost open scope."""
+        self.cdcl.add_clause([-self.scopes.pop()])
+
+    def solve(self, assumptions=()):
+        """Tests whether the constraints are satisfiable.
+
+        Args:
+            assumptions: A sequence of expressions, usually variables or
+                negated variables, that must be true in addition to the
+                constraints. They hold only for this call.
+
+        Returns:
+            A truth assignment to all variables added so far that makes the
+            constraints and the assumptions evaluate to true, or False in
+            case there does not exist such an assignment.
+        """
+        lits = self.scopes + [self.encoder.encode(exp) for exp in assumptions]
+        if not self.cdcl.solve(lits):
+            return False
+        model = self.cdcl.model
+        return {name: model[v] for name, v in self.encoder.names.items()}
+
+
+def row_assignment(variables, row):
+    """Returns the truth assignment that corresponds to a row of a truth
+    table.
+
+    In the rows of a truth table over the variables `variables`, the
+    variable at position `i` is true if and only if bit `i` of the row
+    index is set.
+
+    Args:
+        variables: A sequence of variable names.
+        row: A row index.
+
+    Returns:
+        The truth assignment of the row, as a dictionary mapping variable
+        names to truth values.
+    """
+    return {name: bool(row >> i & 1) for i, name in enumerate(variables)}
+
+
+def truth_table(exp, variables=None, chunk_bits=16):
+    """Yields the truth table of the specified expression in chunks.
+
+    The truth table is computed bit-sliced: every variable is represented
+    by an integer whose bits hold its truth values in `2 ** chunk_bits`
+    consecutive rows, and the `compile`d expression combines these with
+    bitwise operations. Only one chunk is held in memory at a time.
+
+    Args:
+        exp: A Boolean expression.
+        variables: The order of the variables (see `row_assignment`).
+            Defaults to the variables of the expression in sorted order.
+        chunk_bits: The base-2 logarithm of the number of rows per chunk.
+
+    Yields:
+        Pairs consisting of the index of the first row of a chunk and an
+        integer whose bit `j` is the value of the expression in row
+        `first + j`.
+    """
+    compiled = exp.compile(variables, bitwise=True)
+    return _chunks(compiled, chunk_bits, 0, 1 << len(compiled.variables))
+
+
+def _chunks(compiled, chunk_bits, start, stop):
+    n = len(compiled.variables)
+    k = min(n, chunk_bits)
+    width = 1 << k
+    full = (1 << width) - 1
+    low = []
+    for i in range(k):
+        period = 1 << i
+        mask = ((1 << period) - 1) << period
+        period *= 2
+        while period < width:
+            mask |= mask << period
+            period *= 2
+        low.append(mask)
+    for chunk in range(start >> k, stop >> k):
+        high = [full if chunk >> j & 1 else 0 for j in range(n - k)]
+        yield chunk << k, compiled(low + high) & full
+
+
+def first_row(exp, variables=None, chunk_bits=16):
+    """Returns the index of the first row of the truth table of the
+    specified expression in which the expression is true, or None if there
+    is no such row.
+
+    Args:
+        exp: A Boolean expression.
+        variables: The order of the variables (see `truth_table`).
+        chunk_bits: The size of the chunks (see `truth_table`).
+    """
+    for first, bits in truth_table(exp, variables, chunk_bits):
+        if bits:
+            return first + (bits & -bits).bit_length() - 1
+    return None
+
+
+# The state of a worker process of `parallel_search`: the compiled
+# expression, the chunk size and the event that signals that the search is
+# over.
+_search_state = None
+
+
+def _init_search(exp, variables, chunk_bits, found):
+    global _search_state
+    _search_state = (exp.compile(variables, bitwise=True), chunk_bits, found)
+
+
+def _search_partition(start, stop):
+    compiled, chunk_bits, found = _search_state
+    begin = time.perf_counter()
+    rows = 0
+    for first, bits in _chunks(compiled, chunk_bits, start, stop):
+        rows += 1 << min(chunk_bits, len(compiled.variables))
+        if bits:
+            return first + (bits & -bits).bit_length() - 1, os.getpid(), rows, \
+                time.perf_counter() - begin
+        if found.is_set():
+            break
+    return None, os.getpid(), rows, time.perf_counter() - begin
+
+
+def parallel_search(exp, workers=None, split_bits=None, chunk_bits=16):
+    """Searches the truth table of the specified expression for a row in
+    which the expression is true, using several processes.
+
+    The rows are partitioned by fixing the values of the first *split_bits*
+    variables (in sorted order), and the partitions are evaluated
+    bit-sliced (see `truth_table`) on a process pool. The expression is
+    sent to each worker process once, when the process starts. As soon as
+    one worker finds a row, the partitions that have not started are
+    cancelled and the running ones stop after their current chunk.
+
+    Args:
+        exp: A Boolean expression.
+        workers: The number of worker processes. Defaults to the number of
+            processors.
+        split_bits: The number of variables whose values are fixed in a
+            partition. Defaults to enough variables to give each worker
+            about four partitions.
+        chunk_bits: The size of the chunks (see `truth_table`).
+
+    Returns:
+        A pair consisting of a truth assignment that makes the expression
+        evaluate to true (or False if there is no such assignment) and a
+        report that maps the process id of each worker to a pair of the
+        number of rows it evaluated and the time it spent doing so.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if split_bits is None:
+        split_bits = (4 * workers - 1).bit_length()
+    variables = sorted(exp.variables())
+    k = min(split_bits, len(variables))
+    order = variables[k:] + variables[:k]
+    size = 1 << (len(variables) - k)
+    found = multiprocessing.Event()
+    result = False
+    report = {}
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=_init_search,
+            initargs=(exp, order, min(chunk_bits, len(variables) - k), found)) as pool:
+        futures = [pool.submit(_search_partition, p * size, (p + 1) * size)
+                   for p in range(1 << k)]
+        for future in concurrent.futures.as_completed(futures):
+            if future.cancelled():
+                continue
+            row, pid, rows, seconds = future.result()
+            total_rows, total_seconds = report.get(pid, (0, 0.0))
+            report[pid] = (total_rows + rows, total_seconds + seconds)
+            if row is not None and result is False:
+                result = row_assignment(order, row)
+                found.set()
+                for other in futures:
+                    other.cancel()
+    return result, report
+
+
+def satisfiable(exp, method='cdcl'):
     """Tests whether the specified expression is satisfiable.
 
     An expression is satisfiable if there is a truth assignment to its
-    variables that makes the expression evaluate to true.
+    variables that makes the expression evaluate to true. The expression is
+    simplified (see `simplify`) before it is handed to the decision
+    procedure.
 
     Args:
         exp: A Boolean expression.
+        method: The decision procedure to use: `'cdcl'` (the default)
+            translates the expression into clauses and runs the `CDCL`
+            solver on them; `'enumerate'` tries all truth assignments,
+            using the `compile`d form of the expression; `'bitslice'`
+            computes the `truth_table` chunk by chunk; `'parallel'`
+            does the same on several processes (see `parallel_search`);
+            `'bdd'` builds the binary decision diagram of the expression.
 
     Returns:
         A truth assignment that makes the specified expression evaluate to
@@ -164,49 +1949,83 @@ def satisfiable(exp):
         A truth assignment is represented as a dictionary mapping variable
         names to truth values.
     """
-
-    for i in assignments(exp.variables()):
-        if exp.value(i) == True:
-            return i
-    return False
+    assignment = _satisfiable(simplify(exp), method)
+    if assignment is False:
+        return False
+    for name in exp.variables():
+        assignment.setdefault(name, False)
+    return assignment
+
+
+def _satisfiable(exp, method):
+    if method == 'cdcl':
+        encoder = Tseitin()
+        root = encoder.encode(exp)
+        solver = CDCL()
+        for clause in encoder.clauses:
+            solver.add_clause(clause)
+        solver.add_clause([root])
+        if not solver.solve():
+            return False
+        return {name: solver.model[v] for name, v in encoder.names.items()}
+    if method == 'enumerate':
+        compiled = exp.compile()
+        for combination in itertools.product([True, False], repeat=len(compiled.variables)):
+            if compiled(combination):
+                return dict(zip(compiled.variables, combination))
+        return False
+    if method == 'bitslice':
+        variables = sorted(exp.variables())
+        row = first_row(exp, variables)
+        if row is None:
+            return False
+        return row_assignment(variables, row)
+    if method == 'parallel':
+        return parallel_search(exp)[0]
+    if method == 'bdd':
+        manager = bdd_manager()
+        return manager.satisfy(manager.build(exp))
+    raise ValueError("unknown method: {}".format(method))
 
 
-def tautology(exp):
+def tautology(exp, method='cdcl'):
     """Tests whether the specified expression is a tautology.
 
     An expression is a tautology if it evaluates to true under all
-    truth assignments to its variables.
+    truth assignments to its variables, that is, if its negation is not
+    satisfiable.
 
     Args:
         exp: A Boolean expression.
+        method: The decision procedure to use (see `satisfiable`).
 
     Returns:
         True if the specified expression is a tautology, False otherwise.
     """
-    for i in assignments(exp.variables()):
-        if exp.value(i) == False:
-            return False
-    return True
+    if method == 'bdd':
+        return bdd_manager().build(exp) == 1
+    return satisfiable(Nega(exp), method) is False
 
 
-def equivalent(exp1, exp2):
+def equivalent(exp1, exp2, method='cdcl'):
     """Tests whether the specified expressions are equivalent.
 
     Two expressions are equivalent if they have the same truth value under
-    each truth assignment.
+    each truth assignment, that is, if the expression that is true exactly
+    when they differ (their exclusive or) is not satisfiable.
 
     Args:
         exp1: A Boolean expression.
         exp2: A Boolean expression.
+        method: The decision procedure to use (see `satisfiable`).
 
     Returns:
         True if the specified expressions are equivalent, False otherwise.
     """
-
-    for i in assignments(exp1.variables()):
-        if exp1.value(i) != exp2.value(i):
-            return False
-    return True
+    if method == 'bdd':
+        manager = bdd_manager()
+        return manager.build(exp1) == manager.build(exp2)
+    return satisfiable(Nega(Equi(exp1, exp2)), method) is False
 
 def testEquivalent1():
     """Tests two expessions proven not to be equivalent
@@ -263,8 +2082,298 @@ def testTautology1():
     exp1 = Disj(Nega(p), p)
     return tautology(exp1)
 
+def testTautology2():
+    p = Var('p')
+    q = Var('q')
+
+    # Peirce's law
+    exp1 = Impl(Impl(Impl(p, q), p), p)
+    return tautology(exp1)
+
+def testBitslice():
+    """Tests that the bit-sliced truth table agrees with `Exp.value` row by
+    row, across several chunks.
+
+    Returns:
+        True.
+    """
+    p = Var('p')
+    q = Var('q')
+    r = Var('r')
+    s = Var('s')
+    exp1 = Equi(Impl(p, Conj(q, Nega(r))), Disj(s, Nega(p)))
+    variables = ['p', 'q', 'r', 's']
+    for first, bits in truth_table(exp1, variables, chunk_bits=2):
+        for j in range(4):
+            row = row_assignment(variables, first + j)
+            if exp1.value(row) != bool(bits >> j & 1):
+                return False
+    return satisfiable(exp1, 'bitslice') == row_assignment(variables, first_row(exp1))
+
+def testCompile():
+    """Tests that the compiled function agrees with `Exp.value` on every
+    row, for an expression whose shared subexpressions make the compiled
+    code reuse local names, and that enumeration finds a model.
+
+    Returns:
+        True.
+    """
+    p = Var('p')
+    q = Var('q')
+    r = Var('r')
+    s = Var('s')
+    a = Conj(p, q)
+    b = Disj(a, Nega(r))
+    exp1 = Equi(Impl(a, b), Conj(Nega(b), Disj(Impl(s, a), Equi(b, s))))
+    compiled = exp1.compile()
+    for row in itertools.product([True, False], repeat=4):
+        if compiled(row) != exp1.value(dict(zip(compiled.variables, row))):
+            return False
+    model = satisfiable(exp1, 'enumerate')
+    return model is not False and exp1.value(model) and \
+        satisfiable(Conj(exp1, Nega(exp1)), 'enumerate') is False
+
+def testParallel():
+    """Tests the parallel truth table search with two workers, on a
+    satisfiable and an unsatisfiable expression.
+
+    Returns:
+        True.
+    """
+    variables = [Var('x{}'.format(i)) for i in range(8)]
+    exp1 = Conj(Equi(variables[0], Nega(variables[7])), Disj(variables[3], variables[5]))
+    for v in variables[1:]:
+        exp1 = Conj(exp1, Impl(v, variables[0]))
+    model, report = parallel_search(exp1, workers=2, split_bits=2, chunk_bits=3)
+    if model is False or not exp1.value(model) or not report or \
+            any(rows == 0 for rows, _ in report.values()):
+        return False
+    exp2 = Conj(exp1, Nega(variables[0]))
+    model, report = parallel_search(exp2, workers=2, split_bits=2, chunk_bits=3)
+    if model is not False or sum(rows for rows, _ in report.values()) != 1 << 8:
+        return False
+    return exp1.value(satisfiable(exp1, 'parallel'))
+
+def testMemory():
+    """Tests that a chain of 6000 conjunctions takes memory linear in its
+    length; storing the set of variables on every node would take
+    hundreds of megabytes.
+
+    Returns:
+        True.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        exp1 = parse(' ∧ '.join('a{}'.format(i) for i in range(6000)))
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return used < 20 << 20 and len(exp1.variables()) == 6000
+
+def testBdd():
+    """Tests that sifting finds the interleaved variable order for
+    (x1 ∧ y1) v (x2 ∧ y2) v (x3 ∧ y3), starting from the order in which
+    all x come before all y.
+
+    Returns:
+        True.
+    """
+    x = [Var('x{}'.format(i)) for i in range(3)]
+    y = [Var('y{}'.format(i)) for i in range(3)]
+    exp1 = Disj(Disj(Conj(x[0], y[0]), Conj(x[1], y[1])), Conj(x[2], y[2]))
+    manager = BDD(['x0', 'x1', 'x2', 'y0', 'y1', 'y2'])
+    u = manager.build(exp1)
+    if manager.size([u]) != 14 or manager.count(u) != 37:
+        return False
+    u, = manager.sift([u])
+    if manager.size([u]) != 6 or manager.count(u) != 37 or manager.build(exp1) != u:
+        return False
+    # A diagram with a path through 2000 levels.
+    exp2 = Verum()
+    for i in reversed(range(2000)):
+        exp2 = Conj(Var('z{}'.format(i)), exp2)
+    manager = BDD()
+    u = manager.build(exp2)
+    return manager.count(u) == 1 and manager.apply('v', u, manager.negate(u)) == 1
+
+def testParse():
+    """Tests that De Morgan's law parses with the intended precedence and
+    that implication associates to the right.
+
+    Returns:
+        True.
+    """
+    p = Var('p')
+    q = Var('q')
+    r = Var('r')
+    exp1 = parse("-|(p ∧ q) <-> -|p v -|q")
+    exp2 = parse("p -> q -> r")
+    return exp1 is Equi(Nega(Conj(p, q)), Disj(Nega(p), Nega(q))) and \
+        exp2 is Impl(p, Impl(q, r)) and tautology(exp1)
+
+def testDimacs():
+    """Tests that an expression survives a round trip through the DIMACS
+    format up to satisfiability.
+
+    Returns:
+        True.
+    """
+    exp1 = parse("(p <-> q) ∧ (q -> -|r) ∧ (r v p)")
+    file = io.StringIO()
+    write_dimacs(exp1, file)
+    names = {}
+    exp2 = cnf_exp(read_dimacs(io.StringIO(file.getvalue()), names), names)
+    assignment = satisfiable(exp2)
+    return exp1.value({name: assignment[name] for name in exp1.variables()})
+
+def testCountModels():
+    """Tests model counting, also projected onto a subset of the variables.
+
+    Returns:
+        True.
+    """
+    exp1 = parse("(p v q) ∧ (q -> r) ∧ (s <-> -|p)")
+    # The same counter must give the right counts under a new projection.
+    counter = ModelCounter()
+    clauses = [[1, 2], [-1, 3]]
+    return count_models(exp1) == 4 and \
+        count_models(exp1, ['p', 'q']) == 3 and \
+        count_models(exp1, ['p', 'q', 'r', 's', 't']) == 8 and \
+        counter.count(clauses) == 4 and \
+        counter.count(clauses, {1}) == 2 and \
+        counter.count(clauses) == 4
+
+def testSolver():
+    """Tests an incremental session with scopes and assumptions.
+
+    Returns:
+        True.
+    """
+    p = Var('p')
+    q = Var('q')
+    solver = Solver()
+    solver.add(Impl(p, q))
+    solver.push()
+    solver.add(p)
+    if solver.solve([Nega(q)]) != False or solver.solve() != {'p': True, 'q': True}:
+        return False
+    solver.pop()
+    return solver.solve([Nega(q)]) == {'p': False, 'q': False}
+
+def testSimplify():
+    """Tests simplification, and evaluation of an expression that is too
+    deep for recursion.
+
+    Returns:
+        True.
+    """
+    p = Var('p')
+    q = Var('q')
+    exp1 = parse("(p -> q) ∧ (p v (p ∧ q)) ∧ -|-|(q <-> 1)")
+    exp2 = p
+    for i in range(100000):
+        exp2 = Nega(Conj(exp2, q))
+    return simplify(exp1) is Conj(Conj(Disj(Nega(p), q), p), q) and \
+        exp2.value({'p': True, 'q': True}) == True and \
+        simplify(Disj(exp2, Nega(exp2))) is Verum()
+
+def testPigeonhole():
+    """Tests that n + 1 pigeons do not fit into n holes, which is hard for
+    plain enumeration but takes the CDCL solver only a few thousand
+    conflicts.
+
+    Returns:
+        False.
+    """
+    n = 6
+    hole = [[Var('p{}_{}'.format(i, j)) for j in range(n)] for i in range(n + 1)]
+    exp1 = None
+    for i in range(n + 1):
+        somewhere = hole[i][0]
+        for j in range(1, n):
+            somewhere = Disj(somewhere, hole[i][j])
+        exp1 = somewhere if exp1 is None else Conj(exp1, somewhere)
+    for j in range(n):
+        for i in range(n + 1):
+            for k in range(i + 1, n + 1):
+                exp1 = Conj(exp1, Nega(Conj(hole[i][j], hole[k][j])))
+    return satisfiable(exp1) != False
+
+
+def benchmarkCompile(depth=18, rounds=2000):
+    """Compares the time per truth assignment of `Exp.value` and of the
+    `compile`d form on a deep expression in which every level refers to the
+    previous level twice.
+    """
+    names = ['x{}'.format(i) for i in range(8)]
+    exp1 = Var(names[0])
+    for i in range(depth):
+        x = Var(names[i % len(names)])
+        connective = [Conj, Disj, Impl, Equi][i % 4]
+        exp1 = connective(Nega(exp1), Disj(exp1, x))
+    rows = list(itertools.islice(assignments(names), rounds))
+
+    start = time.perf_counter()
+    for row in rows:
+        exp1.value(row)
+    interpreted = (time.perf_counter() - start) / len(rows)
+
+    compiled = exp1.compile(names)
+    vectors = [tuple(row[name] for name in names) for row in rows]
+    start = time.perf_counter()
+    for vector in vectors:
+        compiled(vector)
+    fast = (time.perf_counter() - start) / len(vectors)
+
+    print("value():   {:10.2f} us per assignment".format(interpreted * 1e6))
+    print("compile(): {:10.2f} us per assignment".format(fast * 1e6))
+    print("speedup:   {:10.1f}x".format(interpreted / fast))
+
+
+def benchmarkBitslice(n=22):
+    """Measures the number of truth table rows per second that the
+    bit-sliced evaluation gets through for a tautology over *n* variables.
+    """
+    names = ['x{}'.format(i) for i in range(n)]
+    exp1 = Var(names[0])
+    for name in names[1:]:
+        exp1 = Disj(Conj(exp1, Var(name)), Equi(exp1, Nega(Var(name))))
+    # Search the truth table directly: `tautology` simplifies first, which
+    # folds the negated tautology to a constant without any variables.
+    negation = Nega(Disj(exp1, Nega(exp1)))
+    assert len(negation.variables()) == n
+    start = time.perf_counter()
+    result = first_row(negation, names) is None
+    elapsed = time.perf_counter() - start
+    print("bitslice:  {:10.0f} rows per second ({})".format((1 << n) / elapsed, result))
+
+
+def benchmarkParallel(n=26):
+    """Measures the throughput of each worker of `parallel_search` on a
+    tautology over *n* variables, for which no partition can stop early.
+    """
+    names = ['x{}'.format(i) for i in range(n)]
+    exp1 = Var(names[0])
+    for name in names[1:]:
+        exp1 = Disj(Conj(exp1, Var(name)), Equi(exp1, Nega(Var(name))))
+    contradiction = Conj(exp1, Nega(exp1))
+    assert len(contradiction.variables()) == n
+    start = time.perf_counter()
+    result, report = parallel_search(contradiction)
+    elapsed = time.perf_counter() - start
+    for pid, (rows, seconds) in sorted(report.items()):
+        print("worker {}: {:10.0f} rows per second".format(pid, rows / seconds))
+    print("parallel:  {:10.0f} rows per second ({})".format((1 << n) / elapsed, result))
+
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["bench"]:
+        benchmarkCompile()
+        benchmarkBitslice()
+        benchmarkParallel()
+        sys.exit()
+
     print("Equivalent test 1")
     assert testEquivalent1() == False
     print("Equivalent test 2")
@@ -281,3 +2390,40 @@ if __name__ == "__main__":
 
     print("Tautology test 1")
     assert testTautology1() == True
+    print("Tautology test 2")
+    assert testTautology2() == True
+
+    print("----------")
+
+    print("Compile test")
+    assert testCompile() == True
+    print("Bitslice test")
+    assert testBitslice() == True
+    print("Parallel test")
+    assert testParallel() == True
+
+    print("----------")
+
+    print("BDD test")
+    assert testBdd() == True
+
+    print("----------")
+
+    print("Parse test")
+    assert testParse() == True
+    print("DIMACS test")
+    assert testDimacs() == True
+
+    print("Memory test")
+    assert testMemory() == True
+    print("Count models test")
+    assert testCountModels() == True
+    print("Solver test")
+    assert testSolver() == True
+    print("Simplify test")
+    assert testSimplify() == True
+
+    print("----------")
+
+    print("Pigeonhole test")
+    assert testPigeonhole() == False
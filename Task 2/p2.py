@@ -1,6 +1,9 @@
 # TDP015 Programming Assignment 2
 
 # Do not use any imports!
+#
+# (Code that needs imports, such as benchmarks and the parallel
+# quantifiers, is in the modules p2_*.py next to this file.)
 
 # Part 1: Implement the following quantifiers. You are not allowed to use
 # any libraries or built-in functions for this.
@@ -42,6 +45,8 @@ def test_exists():
 
 def subset(s, t):
     """Test whether *s* is a subset of *t*."""
+    if same_universe(s, t):
+        return s.bits & ~t.bits == 0
     # TODO: Replace the following line with your own code
     for i in s:
         if i not in t:
@@ -59,6 +64,11 @@ def test_subset():
 
 def equal(s, t):
     """Test whether *s* and *t* are equals (as sets)."""
+    if same_universe(s, t):
+        return s.bits == t.bits
+    if isinstance(s, BitSet) or isinstance(t, BitSet):
+        # A BitSet never compares equal to another type of set.
+        return subset(s, t) and subset(t, s)
     if s != t:
         return False
     return True
@@ -74,9 +84,13 @@ def test_equal():
 
 def proper_subset(s, t):
     """Test whether *s* is a proper subset of *t*."""
+    if same_universe(s, t):
+        return s.bits & ~t.bits == 0 and s.bits != t.bits
     for i in s:
         if i not in t:
             return False
+    if isinstance(s, BitSet) or isinstance(t, BitSet):
+        return not subset(t, s)
     if s == t:
         return False
     return True
@@ -92,6 +106,8 @@ def test_proper_subset():
 
 def disjoint(s, t):
     """Test whether *s* and *t* are disjoint."""
+    if same_universe(s, t):
+        return s.bits & t.bits == 0
     for i in s:
         if i in t:
             return False
@@ -129,6 +145,489 @@ def test_subsets():
     assert len(list(subsets(set()))) == 1
     assert len(list(subsets(set(range(6))))) == 64
 
+# The following generators enumerate subsets with as little work per subset
+# as possible. Subsets are identified with bitmasks over the positions of
+# the elements in list(s), as in subsets(). Each generator can produce
+# 'copy' (a new set per subset), 'view' (the same set object, updated in
+# place, which is only valid until the next subset is produced) or 'bits'
+# (the bitmask). The start and stop arguments select a range of ranks, so
+# that a large enumeration can be split into independent parts.
+
+def gray_subsets(s, mode='copy', start=0, stop=None):
+    """Yield the subsets of the set *s* in Gray code order, in which
+    consecutive subsets differ by exactly one element."""
+    elements = list(s)
+    if stop is None:
+        stop = 1 << len(elements)
+    if start >= stop:
+        return
+    bits = start ^ (start >> 1)
+    view = {elements[j] for j in range(len(elements)) if bits >> j & 1}
+    for i in range(start, stop):
+        if i > start:
+            j = (i & -i).bit_length() - 1
+            bits ^= 1 << j
+            if mode != 'bits':
+                if bits >> j & 1:
+                    view.add(elements[j])
+                else:
+                    view.discard(elements[j])
+        if mode == 'bits':
+            yield bits
+        elif mode == 'view':
+            yield view
+        else:
+            yield set(view)
+
+def binomial(n, k):
+    """Return the number of *k*-element subsets of an *n*-element set."""
+    if k < 0 or k > n:
+        return 0
+    result = 1
+    for i in range(min(k, n - k)):
+        result = result * (n - i) // (i + 1)
+    return result
+
+def k_subsets(s, k, mode='copy', start=0, stop=None):
+    """Yield the *k*-element subsets of the set *s* in colex order, that is,
+    in increasing order of their bitmasks."""
+    elements = list(s)
+    n = len(elements)
+    if stop is None:
+        stop = binomial(n, k)
+    if start >= stop:
+        return
+    bits = unrank_bits(n, start, k)
+    view = {elements[j] for j in range(n) if bits >> j & 1}
+    for i in range(start, stop):
+        if i > start:
+            # Gosper's hack: the next larger integer with k bits set.
+            low = bits & -bits
+            ripple = bits + low
+            changed = bits
+            bits = ripple | ((bits ^ ripple) >> 2) // low
+            changed ^= bits
+            if mode != 'bits':
+                while changed:
+                    low = changed & -changed
+                    j = low.bit_length() - 1
+                    if bits & low:
+                        view.add(elements[j])
+                    else:
+                        view.discard(elements[j])
+                    changed ^= low
+        if mode == 'bits':
+            yield bits
+        elif mode == 'view':
+            yield view
+        else:
+            yield set(view)
+
+def rank(s, t, order='binary'):
+    """Return the position of the subset *t* among the subsets of the set
+    *s*, when these are enumerated in the specified order: 'binary' (the
+    order of subsets()), 'gray' (the order of gray_subsets()) or 'colex'
+    (the order of k_subsets(), where k is the size of *t*)."""
+    elements = list(s)
+    bits = 0
+    for j in range(len(elements)):
+        if elements[j] in t:
+            bits |= 1 << j
+    if order == 'binary':
+        return bits
+    if order == 'gray':
+        r = bits
+        shift = bits >> 1
+        while shift:
+            r ^= shift
+            shift >>= 1
+        return r
+    if order == 'colex':
+        r = 0
+        i = 0
+        for j in range(len(elements)):
+            if bits >> j & 1:
+                i += 1
+                r += binomial(j, i)
+        return r
+    raise ValueError("unknown order: {}".format(order))
+
+def unrank_bits(n, r, k=None):
+    """Return the bitmask of the subset at position *r* among the subsets of
+    an *n*-element set: in 'binary' order if *k* is None, otherwise in the
+    colex order of the *k*-element subsets."""
+    if k is None:
+        return r
+    bits = 0
+    for i in range(k, 0, -1):
+        j = i - 1
+        while binomial(j + 1, i) <= r:
+            j += 1
+        r -= binomial(j, i)
+        bits |= 1 << j
+    return bits
+
+def unrank(s, r, order='binary', k=None):
+    """Return the subset at position *r* among the subsets of the set *s*
+    (see rank()). The 'colex' order needs the size *k* of the subset."""
+    elements = list(s)
+    if order == 'binary':
+        bits = r
+    elif order == 'gray':
+        bits = r ^ (r >> 1)
+    elif order == 'colex':
+        if k is None:
+            raise ValueError("the 'colex' order needs the size k of the subset")
+        bits = unrank_bits(len(elements), r, k)
+    else:
+        raise ValueError("unknown order: {}".format(order))
+    return {elements[j] for j in range(len(elements)) if bits >> j & 1}
+
+def test_gray_subsets():
+    print("test_gray_subsets")
+    s = set(range(6))
+    previous = None
+    for r, t in enumerate(gray_subsets(s)):
+        assert rank(s, t, 'gray') == r and unrank(s, r, 'gray') == t
+        if previous is not None:
+            assert len(previous ^ t) == 1
+        previous = t
+    assert r == 63
+    assert list(gray_subsets(s, 'bits', 10, 20)) == \
+        [rank(s, unrank(s, r, 'gray')) for r in range(10, 20)]
+
+def test_k_subsets():
+    print("test_k_subsets")
+    s = set(range(7))
+    assert len(list(k_subsets(s, 3))) == 35
+    for r, t in enumerate(k_subsets(s, 3)):
+        assert len(t) == 3
+        assert rank(s, t, 'colex') == r and unrank(s, r, 'colex', 3) == t
+    assert list(k_subsets(s, 3, 'bits', 5, 9)) == \
+        [rank(s, unrank(s, r, 'colex', 3)) for r in range(5, 9)]
+    try:
+        unrank(s, 5, 'colex')
+    except ValueError:
+        pass
+    else:
+        assert False
+
+# Searching the subsets of a set for those that satisfy some constraints
+# does not need to look at all of them if the constraints are monotone
+# (if a set satisfies it, so do all its supersets; example: the sum is at
+# least 10) or anti-monotone (if a set satisfies it, so do all its subsets;
+# example: the sum is at most 10). The subsets are visited in a
+# set-enumeration tree, in which the descendants of a subset t are the
+# supersets of t that add elements that come after all elements of t.
+
+class SubsetSearch(object):
+    """An iterable over the subsets of a set that satisfy a number of
+    constraints, with whole branches of the set-enumeration tree pruned.
+
+    After (or during) iteration, *visited* is the number of subsets on
+    which the constraints were evaluated and *pruned* the number of
+    subsets that were skipped without evaluating them."""
+
+    def __init__(self, s, monotone=(), antimonotone=(), include=(), exclude=()):
+        """Search the subsets of *s* that contain all elements of *include*,
+        no element of *exclude*, and satisfy all predicates in *monotone*
+        and *antimonotone*."""
+        self.include = [x for x in s if x in include]
+        self.elements = [x for x in s if x not in include and x not in exclude]
+        self.monotone = monotone
+        self.antimonotone = antimonotone
+        self.visited = 0
+        self.pruned = 0
+
+    def __iter__(self):
+        elements = self.elements
+        n = len(elements)
+        stack = [(tuple(self.include), 0)]
+        while stack:
+            chosen, i = stack.pop()
+            self.visited += 1
+            t = set(chosen)
+            if not forall(self.antimonotone, lambda p: p(t)):
+                # No superset of t satisfies the constraints.
+                self.pruned += (1 << (n - i)) - 1
+                continue
+            if self.monotone:
+                largest = t | set(elements[i:])
+                if not forall(self.monotone, lambda p: p(largest)):
+                    # No subset of the largest descendant does.
+                    self.pruned += (1 << (n - i)) - 1
+                    continue
+                if not forall(self.monotone, lambda p: p(t)):
+                    t = None
+            if t is not None:
+                yield t
+            for j in range(n - 1, i - 1, -1):
+                stack.append((chosen + (elements[j],), j + 1))
+
+def test_subset_search():
+    print("test_subset_search")
+    s = set(range(1, 13))
+    search = SubsetSearch(s, monotone=[lambda t: sum(t) >= 20],
+                          antimonotone=[lambda t: sum(t) <= 22],
+                          include={12}, exclude={1})
+    found = list(search)
+    expected = [t for t in subsets(s)
+                if 20 <= sum(t) <= 22 and 12 in t and 1 not in t]
+    assert len(found) == len(expected)
+    assert forall(found, lambda t: exists(expected, lambda u: equal(t, u)))
+    assert search.visited + search.pruned == 1 << 10
+    assert search.visited < 1 << 8
+
+# Part 4: Sets over a fixed universe of elements, represented as bitmasks.
+# The element at position i of the universe is a member of a set if and only
+# if bit i of the set's integer is set, so that the functions from Part 2
+# become single operations on (arbitrarily large) integers.
+
+class Universe(object):
+    """A fixed collection of distinct elements that *BitSet*s are drawn
+    from. Each element is interned at a bit position."""
+
+    def __init__(self, elements):
+        self.elements = []
+        self.position = {}
+        for x in elements:
+            if x not in self.position:
+                self.position[x] = len(self.elements)
+                self.elements.append(x)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def bitset(self, iterable=()):
+        """Return the *BitSet* of the elements of *iterable*, which must all
+        belong to this universe."""
+        bits = 0
+        for x in iterable:
+            bits |= 1 << self.position[x]
+        return BitSet(self, bits)
+
+    def full(self):
+        """Return the *BitSet* of all elements of this universe."""
+        return BitSet(self, (1 << len(self.elements)) - 1)
+
+
+class BitSet(object):
+    """An immutable set of elements of a *Universe*, stored as an integer
+    bitmask."""
+
+    __slots__ = ('universe', 'bits')
+
+    def __init__(self, universe, bits=0):
+        self.universe = universe
+        self.bits = bits
+
+    def __contains__(self, x):
+        i = self.universe.position.get(x)
+        return i is not None and self.bits >> i & 1 == 1
+
+    def __iter__(self):
+        bits = self.bits
+        elements = self.universe.elements
+        while bits:
+            low = bits & -bits
+            yield elements[low.bit_length() - 1]
+            bits ^= low
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __eq__(self, other):
+        if not isinstance(other, BitSet):
+            return NotImplemented
+        return self.universe is other.universe and self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __repr__(self):
+        return 'BitSet({!r})'.format(list(self))
+
+    def _combine(self, other, operation):
+        if not isinstance(other, BitSet):
+            return NotImplemented
+        same_universe(self, other)
+        return BitSet(self.universe, operation(self.bits, other.bits))
+
+    def __or__(self, other):
+        return self._combine(other, lambda a, b: a | b)
+
+    def __and__(self, other):
+        return self._combine(other, lambda a, b: a & b)
+
+    def __sub__(self, other):
+        return self._combine(other, lambda a, b: a & ~b)
+
+    def __xor__(self, other):
+        return self._combine(other, lambda a, b: a ^ b)
+
+
+def same_universe(s, t):
+    """Test whether *s* and *t* are both *BitSet*s. Raise a ValueError if
+    they are, but over different universes."""
+    if isinstance(s, BitSet) and isinstance(t, BitSet):
+        if s.universe is not t.universe:
+            raise ValueError("BitSets over different universes")
+        return True
+    return False
+
+def test_bitset():
+    print("test_bitset")
+    u = Universe(range(100))
+    evens = u.bitset(range(0, 100, 2))
+    small = u.bitset(range(0, 10, 2))
+    odds = u.full() - evens
+    assert len(evens) == 50 and 98 in evens and 99 not in evens
+    assert subset(small, evens) and not subset(evens, small)
+    assert proper_subset(small, evens) and not proper_subset(evens, evens)
+    assert disjoint(evens, odds) and not disjoint(small, evens)
+    assert equal(evens | odds, u.full()) and not equal(small, evens)
+    assert list(small & u.bitset([4, 5, 6])) == [4, 6]
+    # Mixed with plain sets.
+    assert equal(small, {0, 2, 4, 6, 8}) and equal({0, 2, 4, 6, 8}, small)
+    assert not proper_subset(small, {0, 2, 4, 6, 8})
+    assert proper_subset(small, set(range(10))) and not equal(small, set(range(10)))
+    try:
+        small | {1}
+    except TypeError:
+        pass
+    else:
+        assert False
+
+# Part 5: An index over many sets that answers "which stored sets are
+# subsets of / supersets of / disjoint from t" in one traversal, instead of
+# calling subset(), disjoint() etc. once per stored set. The sets are
+# stored in a set-trie: a trie over the elements of each set, sorted by
+# the order in which the index first saw them, so that sets that share
+# their smallest elements share a path.
+
+class SetTrieNode(object):
+    __slots__ = ('children', 'stored')
+
+    def __init__(self):
+        self.children = {}
+        self.stored = None
+
+class SetTrie(object):
+    """A set-trie index of (frozen) sets."""
+
+    def __init__(self, sets=()):
+        self.position = {}
+        self.root = SetTrieNode()
+        self.size = 0
+        for s in sets:
+            self.insert(s)
+
+    def __len__(self):
+        return self.size
+
+    def _key(self, s):
+        return sorted(self.position[x] for x in s)
+
+    def insert(self, s):
+        """Add the set *s* to the index."""
+        for x in s:
+            if x not in self.position:
+                self.position[x] = len(self.position)
+        node = self.root
+        for i in self._key(s):
+            if i not in node.children:
+                node.children[i] = SetTrieNode()
+            node = node.children[i]
+        if node.stored is None:
+            node.stored = frozenset(s)
+            self.size += 1
+
+    def delete(self, s):
+        """Remove the set *s* from the index. Return `True` if it was
+        stored."""
+        if not forall(s, lambda x: x in self.position):
+            return False
+        path = [self.root]
+        for i in self._key(s):
+            node = path[-1].children.get(i)
+            if node is None:
+                return False
+            path.append(node)
+        if path[-1].stored is None:
+            return False
+        path[-1].stored = None
+        self.size -= 1
+        key = self._key(s)
+        while len(path) > 1 and path[-1].stored is None and not path[-1].children:
+            path.pop()
+            del path[-1].children[key[len(path) - 1]]
+        return True
+
+    def __contains__(self, s):
+        if not forall(s, lambda x: x in self.position):
+            return False
+        node = self.root
+        for i in self._key(s):
+            node = node.children.get(i)
+            if node is None:
+                return False
+        return node.stored is not None
+
+    def subsets_of(self, t):
+        """Yield the stored sets that are subsets of *t*."""
+        allowed = {self.position[x] for x in t if x in self.position}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.stored is not None:
+                yield node.stored
+            for i, child in node.children.items():
+                if i in allowed:
+                    stack.append(child)
+
+    def disjoint_from(self, t):
+        """Yield the stored sets that are disjoint from *t*."""
+        forbidden = {self.position[x] for x in t if x in self.position}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.stored is not None:
+                yield node.stored
+            for i, child in node.children.items():
+                if i not in forbidden:
+                    stack.append(child)
+
+    def supersets_of(self, t):
+        """Yield the stored sets that are supersets of *t*."""
+        if not forall(t, lambda x: x in self.position):
+            return
+        key = self._key(t)
+        stack = [(self.root, 0)]
+        while stack:
+            node, j = stack.pop()
+            if j == len(key) and node.stored is not None:
+                yield node.stored
+            for i, child in node.children.items():
+                if j == len(key) or i < key[j]:
+                    stack.append((child, j))
+                elif i == key[j]:
+                    stack.append((child, j + 1))
+
+def test_set_trie():
+    print("test_set_trie")
+    stored = [set(), {0}, {1}, {0, 1}, {1, 2}, {0, 2, 3}, {3}]
+    trie = SetTrie(stored)
+    t = {0, 1, 3}
+    def same(found, expected):
+        return len(found) == len(expected) and \
+            forall(found, lambda s: exists(expected, lambda u: equal(s, u)))
+    assert same(list(trie.subsets_of(t)), [s for s in stored if subset(s, t)])
+    assert same(list(trie.disjoint_from(t)), [s for s in stored if disjoint(s, t)])
+    assert same(list(trie.supersets_of({0})), [s for s in stored if subset({0}, s)])
+    assert trie.delete({0, 1}) and not trie.delete({0, 1}) and {0, 1} not in trie
+    assert len(trie) == 6 and {0, 2, 3} in trie
+    assert same(list(trie.supersets_of({1})), [{1}, {1, 2}])
+
 if __name__ == '__main__':
     test_forall()
     test_exists()
@@ -137,3 +636,8 @@ if __name__ == '__main__':
     test_proper_subset()
     test_disjoint()
     test_subsets()
+    test_gray_subsets()
+    test_k_subsets()
+    test_subset_search()
+    test_bitset()
+    test_set_trie()
@@ -0,0 +1,39 @@
+# Benchmarks for the set-trie index in p2.py.
+
+import random
+import time
+
+from p2 import SetTrie, disjoint, subset
+
+
+def benchmark_set_trie(n_sets=100000, n_queries=100, universe=40, size=6):
+    """Compare bulk subset and disjointness queries on a SetTrie with a
+    linear scan that calls subset() and disjoint() once per stored set."""
+    rng = random.Random(0)
+    stored = [frozenset(rng.sample(range(universe), rng.randint(1, size)))
+              for _ in range(n_sets)]
+    stored = list(set(stored))
+    queries = [set(rng.sample(range(universe), universe // 2))
+               for _ in range(n_queries)]
+
+    start = time.perf_counter()
+    trie = SetTrie(stored)
+    print("build:              {:8.3f} s for {} sets".format(
+        time.perf_counter() - start, len(trie)))
+
+    for name, predicate, query in [
+            ("subsets_of", lambda s, t: subset(s, t), SetTrie.subsets_of),
+            ("disjoint_from", lambda s, t: disjoint(s, t), SetTrie.disjoint_from)]:
+        start = time.perf_counter()
+        scanned = [sum(1 for s in stored if predicate(s, t)) for t in queries]
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        indexed = [sum(1 for _ in query(trie, t)) for t in queries]
+        index = time.perf_counter() - start
+        assert scanned == indexed
+        print("{:14s} scan: {:8.3f} s, trie: {:8.3f} s, speedup {:6.1f}x".format(
+            name, scan, index, scan / index))
+
+
+if __name__ == '__main__':
+    benchmark_set_trie()
@@ -0,0 +1,237 @@
+# Parallel, asynchronous and vectorised variants of the quantifiers forall()
+# and exists() from p2.py.
+#
+# All variants keep the short-circuit behaviour of the originals: as soon
+# as the result is decided, no further elements are handed out and work
+# that has not started yet is cancelled.
+
+import asyncio
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+
+
+# The event that tells the workers of a process pool to stop, set in each
+# worker process when it starts.
+_stop = None
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def _any_in_chunk(predicate, chunk, wanted, stop=None):
+    """Return `True` if *predicate* returns *wanted* (as a truth value) for
+    some element of *chunk*. Give up early once *stop* (by default, the
+    event of the worker process) is set."""
+    if stop is None:
+        stop = _stop
+    for x in chunk:
+        if stop.is_set():
+            return False
+        if bool(predicate(x)) == wanted:
+            return True
+    return False
+
+
+def _parallel_any(iterable, predicate, wanted, pool, workers, chunk_size):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if pool == 'thread':
+        stop = threading.Event()
+        executor = concurrent.futures.ThreadPoolExecutor(workers)
+        local_stop = stop
+    elif pool == 'process':
+        stop = multiprocessing.Event()
+        executor = concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(stop,))
+        local_stop = None
+    else:
+        raise ValueError("unknown pool: {}".format(pool))
+    iterator = iter(iterable)
+    pending = set()
+    found = False
+    try:
+        while True:
+            # Keep a bounded number of chunks in flight, so that huge (or
+            # infinite) iterables are consumed only as far as needed.
+            while len(pending) < 2 * workers:
+                chunk = list(itertools.islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                pending.add(executor.submit(_any_in_chunk, predicate, chunk, wanted, local_stop))
+            if not pending:
+                break
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            if any(future.result() for future in done):
+                found = True
+                break
+    finally:
+        # Once the result is decided, do not wait for the chunks in
+        # flight: those that have not started are cancelled, and the
+        # running ones stop at their next element.
+        stop.set()
+        executor.shutdown(wait=not found, cancel_futures=True)
+    return found
+
+
+def parallel_forall(iterable, predicate, pool='thread', workers=None, chunk_size=64):
+    """Return `True` if *predicate* returns `True` for all elements of
+    *iterable*, evaluating the predicate on chunks of *chunk_size* elements
+    on a pool of *workers* threads or processes (*pool* is 'thread' or
+    'process'). For a process pool, *predicate* must be picklable. Workers
+    check after every element whether the result has been decided."""
+    return not _parallel_any(iterable, predicate, False, pool, workers, chunk_size)
+
+
+def parallel_exists(iterable, predicate, pool='thread', workers=None, chunk_size=64):
+    """Return `True` if *predicate* returns `True` for at least one element
+    of *iterable* (see parallel_forall())."""
+    return _parallel_any(iterable, predicate, True, pool, workers, chunk_size)
+
+
+async def _async_any(iterable, predicate, wanted, concurrency):
+    iterator = iter(iterable)
+    pending = set()
+    found = False
+    try:
+        while True:
+            while len(pending) < concurrency:
+                x = next(iterator, iterator)
+                if x is iterator:
+                    break
+                pending.add(asyncio.ensure_future(predicate(x)))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            if any(bool(task.result()) == wanted for task in done):
+                found = True
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+    return found
+
+
+async def async_forall(iterable, predicate, concurrency=16):
+    """Return `True` if the coroutine function *predicate* returns `True`
+    for all elements of *iterable*, running at most *concurrency*
+    predicates at a time. Outstanding predicates are cancelled as soon as
+    one returns `False`."""
+    return not await _async_any(iterable, predicate, False, concurrency)
+
+
+async def async_exists(iterable, predicate, concurrency=16):
+    """Return `True` if the coroutine function *predicate* returns `True`
+    for at least one element of *iterable* (see async_forall())."""
+    return await _async_any(iterable, predicate, True, concurrency)
+
+
+def _all(mask):
+    return bool(mask.all()) if hasattr(mask, 'all') else all(mask)
+
+
+def vectorized_forall(array, predicate, chunk_size=None):
+    """Return `True` if *predicate* holds for all elements of *array*, where
+    *predicate* maps an array (for example, a NumPy array) to an array of
+    truth values in one call. With a *chunk_size*, the array is processed
+    in slices of that length, stopping at the first slice that decides the
+    result."""
+    if chunk_size is None:
+        return _all(predicate(array))
+    for i in range(0, len(array), chunk_size):
+        if not _all(predicate(array[i:i + chunk_size])):
+            return False
+    return True
+
+
+def vectorized_exists(array, predicate, chunk_size=None):
+    """Return `True` if *predicate* holds for at least one element of
+    *array* (see vectorized_forall())."""
+    def negation(chunk):
+        mask = predicate(chunk)
+        return ~mask if hasattr(mask, 'all') else [not x for x in mask]
+    return not vectorized_forall(array, negation, chunk_size)
+
+
+class _CountingBool(object):
+    """A slow bool() that counts its calls in the shared value *calls*
+    (from a multiprocessing manager, so that it also counts the calls in
+    the worker processes of a process pool)."""
+
+    def __init__(self, calls, lock):
+        self.calls = calls
+        self.lock = lock
+
+    def __call__(self, x):
+        with self.lock:
+            self.calls.value += 1
+        time.sleep(0.01)
+        return bool(x)
+
+
+def test_parallel_forall():
+    print("test_parallel_forall")
+    for pool in ('thread', 'process'):
+        assert parallel_forall([], bool, pool)
+        assert parallel_forall(range(1, 1000), bool, pool, 2, 16)
+        assert not parallel_forall(range(0, 1000), bool, pool, 2, 16)
+        # Stops handing out chunks once the first element decides the
+        # result: at most the 8 chunks in flight (512 elements) are ever
+        # evaluated.
+        with multiprocessing.Manager() as manager:
+            predicate = _CountingBool(manager.Value('i', 0), manager.Lock())
+            assert not parallel_forall(range(100000), predicate, pool, 4, 64)
+            time.sleep(0.1)
+            assert predicate.calls.value <= 2 * 4 * 64
+    # Short-circuits on an infinite iterable.
+    assert not parallel_forall(itertools.count(1000, -1), bool)
+
+
+def test_parallel_exists():
+    print("test_parallel_exists")
+    for pool in ('thread', 'process'):
+        assert not parallel_exists([], bool, pool)
+        assert parallel_exists(range(0, 1000), bool, pool, 2, 16)
+        assert not parallel_exists([0] * 1000, bool, pool, 2, 16)
+    assert parallel_exists(itertools.count(), bool)
+
+
+def test_async():
+    print("test_async")
+
+    async def positive(x):
+        await asyncio.sleep(0)
+        return x > 0
+
+    assert asyncio.run(async_forall(range(1, 100), positive, 4))
+    assert not asyncio.run(async_forall(range(-1, 100), positive, 4))
+    assert asyncio.run(async_exists(itertools.count(-100), positive, 4))
+    assert not asyncio.run(async_exists(range(-100, 1), positive))
+
+
+def test_vectorized():
+    print("test_vectorized")
+
+    def positive(chunk):
+        return [x > 0 for x in chunk]
+
+    assert vectorized_forall(list(range(1, 100)), positive)
+    assert not vectorized_forall(list(range(0, 100)), positive, 10)
+    assert vectorized_exists(list(range(-100, 1)) + [1], positive, 10)
+    assert not vectorized_exists(list(range(-100, 1)), positive)
+
+
+if __name__ == '__main__':
+    test_parallel_forall()
+    test_parallel_exists()
+    test_async()
+    test_vectorized()
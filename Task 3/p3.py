@@ -1,6 +1,9 @@
 # TDP015 Programming Assignment 3
 
 # Do not use any imports!
+#
+# (Code that needs imports, such as benchmarks and the parallel
+# enumeration, is in the modules p3_*.py next to this file.)
 
 # In this assignment you are asked to implement functions on *nested
 # pairs*. The set of nested pairs is defined recursively:
@@ -56,23 +59,138 @@
 # sequence of numbers given above.
 
 
-def nested_pairs(n):
-    """Yield all nested pairs with degree *n*."""
+def nested_pairs(n, encoded=False):
+    """Yield all nested pairs with degree *n*. If *encoded* is true, yield
+    them as Dyck words (see encode_pair()) instead of tuples."""
     if n <= 1:
-        yield ()
+        yield 1 if encoded else ()
 
     for i in range(1, n):
-        for x in nested_pairs(i):
+        for x in nested_pairs(i, encoded):
             # this was the issue. (n-1) gives the wrong amount of tuples.
             # Should be (n-i)
-            for y in nested_pairs(n - i):
-                yield(x, y)
+            for y in nested_pairs(n - i, encoded):
+                yield join_words(x, y) if encoded else (x, y)
 
 # ## Test
 # for i in nested_pairs(3):
 #   print(i)
 
 
+# The recursive generator above passes every nested pair up through a chain
+# of generator frames, and re-enumerates the pairs of the smaller degrees
+# for every split. The following generator yields the same nested pairs in
+# the same order without recursion.
+#
+# The nested pairs of the degrees up to SMALL_DEGREE are computed once, as
+# lists, bottom-up. A larger nested pair is kept as a tree of *states*, one
+# per subpair, and advanced like an odometer: the right part of a pair
+# moves fastest, then the left part, then the split. A state of degree at
+# most SMALL_DEGREE is just a position in the list for its degree. The
+# state at the bottom of the right spine of the whole nested pair moves
+# fastest of all, so the generator sweeps it through its list in a tight
+# loop, rebuilding only the tuples along the right spine; the states
+# above it are advanced only once per sweep. All other subpairs are shared
+# with the previous nested pair, so the work per nested pair is the number
+# of tuples on the path from the root to the subpair that changed. That
+# path gets longer as n grows, and so do the descents after short sweeps,
+# so the time per nested pair is not constant: it grows slowly with n.
+#
+# A state is a list [degree, split or position, left state, right state,
+# nested pair]. A fresh state of a larger degree stands for the first
+# nested pair of its degree, the right comb ((), ((), ...)); its left and
+# right states are None until it is advanced for the first time.
+
+SMALL_DEGREE = 10
+
+
+def small_nested_pairs(n):
+    """Return a list whose element *d* is the list of all nested pairs with
+    degree *d*, in the order of nested_pairs(), for *d* up to *n*."""
+    pairs = [[()], [()]]
+    for degree in range(2, n + 1):
+        pairs.append([(x, y)
+                      for i in range(1, degree)
+                      for x in pairs[i]
+                      for y in pairs[degree - i]])
+    return pairs
+
+
+def nested_pairs_iterative(n):
+    """Yield all nested pairs with degree *n*, in the same order as
+    nested_pairs(), without recursion."""
+    small = small_nested_pairs(min(max(n, 1), SMALL_DEGREE))
+    if n <= SMALL_DEGREE:
+        for pair in small[max(n, 1)]:
+            yield pair
+        return
+    combs = [(), ()]
+    for degree in range(2, n + 1):
+        combs.append(((), combs[-1]))
+
+    def first(degree):
+        if degree <= SMALL_DEGREE:
+            return [degree, 0, None, None, small[degree][0]]
+        return [degree, 1, None, None, combs[degree]]
+
+    root = first(n)
+    while True:
+        # Sweep the state at the bottom of the right spine.
+        lefts = []
+        state = root
+        while state[0] > SMALL_DEGREE:
+            if state[2] is None:
+                state[2] = first(1)
+                state[3] = first(state[0] - 1)
+            lefts.append(state[2][4])
+            state = state[3]
+        lefts.reverse()
+        bottom = small[state[0]]
+        for y in bottom[state[1]:]:
+            for x in lefts:
+                y = (x, y)
+            yield y
+        state[1] = len(bottom) - 1
+        # Advance the root. Each entry on the stack is a state and the
+        # phase of advancing it: 0 = try the right part, 1 = the right part
+        # could not advance, try the left part, 2 = neither could advance,
+        # try the next split. *advanced* is the result of the last state
+        # that was done.
+        stack = [(root, 0)]
+        advanced = False
+        while stack:
+            state, phase = stack.pop()
+            degree = state[0]
+            if degree <= SMALL_DEGREE:
+                advanced = state[1] + 1 < len(small[degree])
+                if advanced:
+                    state[1] += 1
+                    state[4] = small[degree][state[1]]
+            elif phase == 0:
+                if state[2] is None:
+                    state[2] = first(1)
+                    state[3] = first(degree - 1)
+                stack.append((state, 1))
+                stack.append((state[3], 0))
+            elif phase == 1:
+                if advanced:
+                    state[4] = (state[2][4], state[3][4])
+                else:
+                    stack.append((state, 2))
+                    stack.append((state[2], 0))
+            elif advanced:
+                state[3] = first(degree - state[1])
+                state[4] = (state[2][4], state[3][4])
+            elif state[1] + 1 < degree:
+                split = state[1] = state[1] + 1
+                state[2] = first(split)
+                state[3] = first(degree - split)
+                state[4] = (state[2][4], state[3][4])
+                advanced = True
+        if not advanced:
+            return
+
+
 # ## Problem 2
 #
 # Implement a function count_nested_pairs() that counts the number of
@@ -130,21 +248,372 @@ def count_nested_pairs(n):
 # could do in under one minute in Problem 2?
 
 
-memorized = {}
+# The memo table is encapsulated in a class. It stores the counts for the
+# degrees 0, 1, 2, ... in a tuple and extends it iteratively, using the
+# closed formula for the Catalan numbers C(m) = binomial(2m, m) / (m + 1)
+# in its recursive form C(m) = C(m - 1) * 2 * (2m - 1) / (m + 1), where
+# the division is always exact. The number of nested pairs of degree n is
+# C(n - 1). There is no recursion, so there is no limit on n.
+#
+# The table is never modified in place: an extension builds a new tuple
+# and then replaces the old one in a single assignment. Threads that read
+# the table concurrently therefore always see a consistent table, without
+# any locks; two threads that extend it at the same time compute the same
+# values, and one of the two extensions is kept.
+#
+# The count for degree n has about 2n bits, so a table of N entries holds
+# about N * N bits in all: the default of 4096 entries is about 2 MB, while
+# 100000 entries would be more than 1 GB.
+
+
+class NestedPairCounts(object):
+    """A memo table for the number of nested pairs of each degree, holding
+    at most *max_size* entries. Counts for larger degrees are computed
+    without being stored."""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.table = (1, 1)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __call__(self, n):
+        """Count the number of nested pairs with degree *n*."""
+        if n <= 1:
+            return 1
+        table = self.table
+        if n < len(table):
+            return table[n]
+        if n < self.max_size:
+            table = self._extend(n + 1)
+            return table[n]
+        return next_counts(table[-1], len(table) - 1, n + 1)[-1]
+
+    def _extend(self, size):
+        table = self.table
+        if size > len(table):
+            table = table + tuple(next_counts(table[-1], len(table) - 1, size))
+            self.table = table
+        return table
+
+    def count_range(self, lo, hi):
+        """Return the list of the numbers of nested pairs with the degrees
+        *lo*, *lo* + 1, ..., *hi* - 1, computed in a single pass."""
+        lo = max(lo, 0)
+        if hi <= lo:
+            return []
+        table = self._extend(min(hi, self.max_size))
+        counts = list(table[lo:hi])
+        if hi > len(table):
+            start = max(lo, len(table))
+            if start > len(table):
+                first = next_counts(table[-1], len(table) - 1, start)[-1]
+            else:
+                first = table[-1]
+            counts += next_counts(first, start - 1, hi)
+        return counts
+
+
+def next_counts(count, n, stop):
+    """Given the number *count* of nested pairs with degree *n* (at least
+    1), return the list of the numbers for the degrees *n* + 1, ...,
+    *stop* - 1."""
+    counts = []
+    for degree in range(n + 1, stop):
+        m = degree - 1
+        if m > 0:
+            count = count * 2 * (2 * m - 1) // (m + 1)
+        counts.append(count)
+    return counts
+
+
+nested_pair_counts = NestedPairCounts()
 
 
 def count_nested_pairs_memoized(n):
-    if n <= 1:
-        return 1
+    """Count the number of nested pairs with degree *n*, using the shared
+    memo table."""
+    return nested_pair_counts(n)
 
-    res = 0
-    if n not in memorized:
-        for i in range(1, n):
-            res += count_nested_pairs_memoized(i) * \
-                count_nested_pairs_memoized(n - i)
-        memorized[n] = res
-    return memorized[n]
+
+def count_range(lo, hi):
+    """Return the list of the numbers of nested pairs with the degrees
+    *lo*, ..., *hi* - 1, using the shared memo table."""
+    return nested_pair_counts.count_range(lo, hi)
 
 # ## Test
 # for i in range(100):
 #    print("i: " + str(i) + " - number: " + str(count_nested_pairs_memoized(i)))
+
+
+# With the counts, a nested pair can be located in the sequence yielded by
+# nested_pairs() without generating that sequence. The nested pairs of
+# degree n with left part of degree i come after those with smaller left
+# parts, and are ordered first by their left part and then by their right
+# part, so the rank of (x, y) is
+#
+#   sum(count(j) * count(n - j) for j < i) + rank(x) * count(n - i) + rank(y)
+#
+# Both directions work with explicit stacks instead of recursion, and
+# take O(n^2) operations on (big) integers.
+
+
+def degree(pair):
+    """Return the degree of the nested pair *pair*."""
+    result = 0
+    stack = [pair]
+    while stack:
+        pair = stack.pop()
+        if pair == ():
+            result += 1
+        else:
+            stack.extend(pair)
+    return result
+
+
+def rank(pair):
+    """Return the position of the nested pair *pair* in the sequence
+    yielded by nested_pairs(degree(pair)), counting from 0."""
+    count = count_nested_pairs_memoized
+    results = []
+    stack = [(pair, False)]
+    while stack:
+        pair, expanded = stack.pop()
+        if pair == ():
+            results.append((1, 0))
+        elif not expanded:
+            stack.append((pair, True))
+            stack.append((pair[1], False))
+            stack.append((pair[0], False))
+        else:
+            right_degree, right_rank = results.pop()
+            left_degree, left_rank = results.pop()
+            n = left_degree + right_degree
+            offset = 0
+            for j in range(1, left_degree):
+                offset += count(j) * count(n - j)
+            results.append((n, offset + left_rank * count(right_degree) + right_rank))
+    return results[0][1]
+
+
+def unrank(n, k):
+    """Return the nested pair at position *k* (counting from 0) in the
+    sequence yielded by nested_pairs(n)."""
+    count = count_nested_pairs_memoized
+    if not 0 <= k < count(n):
+        raise ValueError("no nested pair of degree {} at position {}".format(n, k))
+    results = []
+    stack = [(n, k)]
+    while stack:
+        n, k = stack.pop()
+        if n is None:
+            right = results.pop()
+            left = results.pop()
+            results.append((left, right))
+        elif n <= 1:
+            results.append(())
+        else:
+            i = 1
+            while k >= count(i) * count(n - i):
+                k -= count(i) * count(n - i)
+                i += 1
+            left_rank, right_rank = divmod(k, count(n - i))
+            stack.append((None, None))
+            stack.append((n - i, right_rank))
+            stack.append((i, left_rank))
+    return results[0]
+
+
+def sample(n, rng):
+    """Return a nested pair with degree *n*, drawn uniformly at random
+    using the random number generator *rng* (for example, an instance of
+    random.Random)."""
+    return unrank(n, rng.randrange(count_nested_pairs_memoized(n)))
+
+
+def nested_pairs_range(n, lo, hi, encoded=False):
+    """Yield the nested pairs at the positions *lo* (inclusive) to *hi*
+    (exclusive) in the sequence yielded by nested_pairs(n, *encoded*)."""
+    count = count_nested_pairs_memoized
+    if n <= 1:
+        if lo <= 0 < hi:
+            yield 1 if encoded else ()
+        return
+    offset = 0
+    for i in range(1, n):
+        if offset >= hi:
+            break
+        right_count = count(n - i)
+        size = count(i) * right_count
+        start, stop = max(lo - offset, 0), min(hi - offset, size)
+        offset += size
+        if start >= stop:
+            continue
+        # Only the first and the last left part can be combined with a
+        # proper subrange of the right parts.
+        first, first_right = divmod(start, right_count)
+        last, last_right = divmod(stop - 1, right_count)
+        for r, x in enumerate(nested_pairs_range(i, first, last + 1, encoded), first):
+            right_start = first_right if r == first else 0
+            right_stop = last_right + 1 if r == last else right_count
+            if right_start == 0 and right_stop == right_count:
+                if encoded:
+                    right_parts = nested_pairs(n - i, True)
+                else:
+                    right_parts = nested_pairs_iterative(n - i)
+            else:
+                right_parts = nested_pairs_range(n - i, right_start, right_stop, encoded)
+            for y in right_parts:
+                yield join_words(x, y) if encoded else (x, y)
+
+
+# A nested pair of degree n is a tree of 2n - 1 tuples. More compactly, it
+# can be written as a *Dyck word*, a balanced sequence of parentheses: ()
+# is the empty word, and (x, y) is "(" + x + ")" + y. The word has length
+# 2(n - 1) and is stored as the bits of an int, with 1 for "(" and 0 for
+# ")", behind a leading 1 bit that marks where the word starts. An int
+# can be turned into bytes and back with int.to_bytes() and
+# int.from_bytes(), and the leading bit makes the length recoverable.
+#
+# The tree structure can be read off the word directly: in the word
+# "(" + x + ")" + y, the parenthesis matching the first one separates the
+# left part x from the right part y.
+
+
+def join_words(x, y):
+    """Return the Dyck word of the nested pair (x, y), where *x* and *y*
+    are the Dyck words of its parts."""
+    lx = x.bit_length() - 1
+    ly = y.bit_length() - 1
+    return (x | 2 << lx) << (ly + 1) | (y ^ 1 << ly)
+
+
+def split_word(word):
+    """Return the Dyck words of the left and the right part of the nested
+    pair with the Dyck word *word*."""
+    bits = bin(word)[3:]
+    if not bits:
+        raise ValueError("the nested pair () has no parts")
+    level = 0
+    for i, bit in enumerate(bits):
+        level += 1 if bit == '1' else -1
+        if level == 0:
+            return int('1' + bits[1:i], 2), int('1' + bits[i + 1:], 2)
+    raise ValueError("not a Dyck word: {}".format(bits))
+
+
+def word_degree(word):
+    """Return the degree of the nested pair with the Dyck word *word*."""
+    return (word.bit_length() + 1) // 2
+
+
+def word_depth(word):
+    """Return the depth of the nested pair with the Dyck word *word*, that
+    is, the largest number of tuples around any of its empty tuples."""
+    # A word is a sequence of groups "(" + x + ")" whose nested pairs lie
+    # along the right spine of the whole, so the j-th group (counting
+    # from 1) lies j levels below the surrounding group.
+    result = 0
+    base, group = 0, 0
+    stack = []
+    for bit in bin(word)[3:]:
+        if bit == '1':
+            group += 1
+            stack.append((base, group))
+            base, group = base + group, 0
+            result = max(result, base)
+        else:
+            base, group = stack.pop()
+    return result
+
+
+def encode_pair(pair):
+    """Return the Dyck word of the nested pair *pair*."""
+    bits = []
+    stack = [pair]
+    while stack:
+        pair = stack.pop()
+        if pair is None:
+            bits.append('0')
+        elif pair != ():
+            bits.append('1')
+            stack.append(pair[1])
+            stack.append(None)
+            stack.append(pair[0])
+    return int('1' + ''.join(bits), 2)
+
+
+def decode_word(word):
+    """Return the nested pair with the Dyck word *word*."""
+    # Read the word from right to left: at ")", the right part y is
+    # complete; at the matching "(", so is the left part x.
+    pair = ()
+    stack = []
+    for bit in reversed(bin(word)[3:]):
+        if bit == '0':
+            stack.append(pair)
+            pair = ()
+        else:
+            pair = (pair, stack.pop())
+    return pair
+
+
+def test_nested_pairs_iterative():
+    print("test_nested_pairs_iterative")
+    for n in range(14):
+        assert list(nested_pairs_iterative(n)) == list(nested_pairs(n))
+
+
+def test_rank():
+    print("test_rank")
+    for n in range(1, 9):
+        for k, pair in enumerate(nested_pairs(n)):
+            assert degree(pair) == n and rank(pair) == k and unrank(n, k) == pair
+    pairs = list(nested_pairs(8))
+    for lo, hi in [(0, len(pairs)), (3, 4), (5, 200), (17, 398), (400, 500)]:
+        assert list(nested_pairs_range(8, lo, hi)) == pairs[lo:hi]
+        assert list(nested_pairs_range(8, lo, hi, True)) == \
+            [encode_pair(pair) for pair in pairs[lo:hi]]
+    last = count_nested_pairs_memoized(300) - 1
+    assert rank(unrank(300, last)) == last
+
+
+def test_dyck_words():
+    print("test_dyck_words")
+
+    def depth(pair):
+        return 1 + max(depth(pair[0]), depth(pair[1])) if pair else 0
+
+    for n in range(1, 9):
+        words = list(nested_pairs(n, encoded=True))
+        for pair, word in zip(nested_pairs(n), words):
+            assert encode_pair(pair) == word and decode_word(word) == pair
+            assert word_degree(word) == n and word_depth(word) == depth(pair)
+            if n > 1:
+                x, y = split_word(word)
+                assert (decode_word(x), decode_word(y)) == pair
+                assert join_words(x, y) == word
+        assert len(set(words)) == count_nested_pairs_memoized(n)
+
+
+def test_count_nested_pairs():
+    print("test_count_nested_pairs")
+    expected = [1, 1, 1, 2, 5, 14, 42, 132, 429, 1430, 4862, 16796]
+    assert [count_nested_pairs(n) for n in range(12)] == expected
+    assert [count_nested_pairs_memoized(n) for n in range(12)] == expected
+    assert count_range(0, 12) == expected
+    small = NestedPairCounts(max_size=5)
+    assert small.count_range(3, 12) == expected[3:]
+    assert small(11) == expected[11] and len(small) == 5
+    table = NestedPairCounts()
+    assert table(10) == expected[10] and len(table) == 11
+    # Far beyond the recursion limit.
+    assert count_nested_pairs_memoized(5001) == count_range(5000, 5002)[1]
+
+
+if __name__ == '__main__':
+    test_nested_pairs_iterative()
+    test_rank()
+    test_dyck_words()
+    test_count_nested_pairs()
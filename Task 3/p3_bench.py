@@ -0,0 +1,33 @@
+# Benchmarks for the nested pair generators in p3.py.
+
+import time
+
+from p3 import count_nested_pairs, nested_pairs, nested_pairs_iterative
+
+
+def rate(generator, expected):
+    """Return the number of nested pairs per second that *generator*
+    yields, measured over all of them; *expected* is their number."""
+    start = time.perf_counter()
+    count = sum(1 for _ in generator)
+    elapsed = time.perf_counter() - start
+    assert count == expected, (count, expected)
+    return count / elapsed
+
+
+def benchmark_nested_pairs(max_degree=16):
+    """Compare the nested pairs per second of nested_pairs() and
+    nested_pairs_iterative() for the degrees up to *max_degree*. Every
+    degree is enumerated in full, so that the rates include the late
+    nested pairs, whose subpairs are deeper than those of the first ones."""
+    print("degree       pairs   recursive/s   iterative/s   speedup")
+    for n in range(2, max_degree + 1):
+        expected = count_nested_pairs(n)
+        recursive = rate(nested_pairs(n), expected)
+        iterative = rate(nested_pairs_iterative(n), expected)
+        print("{:6d}  {:10d}  {:12.0f}  {:12.0f}  {:7.2f}x".format(
+            n, expected, recursive, iterative, iterative / recursive))
+
+
+if __name__ == '__main__':
+    benchmark_nested_pairs()
@@ -0,0 +1,133 @@
+# Enumeration of nested pairs on a pool of processes.
+#
+# The sequence yielded by nested_pairs(n) is cut into shards, ranges of
+# positions that are enumerated by nested_pairs_range() in separate
+# processes. Because the number of nested pairs of every degree is known,
+# shards of equal size can be cut without generating anything. The shards
+# come back as lists of at most *chunk_size* nested pairs, and only a
+# bounded number of them is in flight at a time, so the whole sequence is
+# never held in memory.
+
+import concurrent.futures
+import os
+
+from p3 import count_nested_pairs_memoized, encode_pair, nested_pairs, nested_pairs_range
+
+
+def splits(n):
+    """Return the list of ranges (lo, hi) of positions in the sequence
+    yielded by nested_pairs(n) that hold its top-level splits (left part
+    of degree i, for i = 1, 2, ...), in sequence order."""
+    count = count_nested_pairs_memoized
+    if n <= 1:
+        return [(0, 1)]
+    result = []
+    offset = 0
+    for i in range(1, n):
+        size = count(i) * count(n - i)
+        result.append((offset, offset + size))
+        offset += size
+    return result
+
+
+def shards(n, chunk_size, by='split', largest_first=False):
+    """Yield the ranges (lo, hi) of positions in the sequence yielded by
+    nested_pairs(n) that make up its shards, in sequence order. With *by*
+    = 'rank', the sequence is cut into shards of *chunk_size* nested
+    pairs. With *by* = 'split', every top-level split is cut separately,
+    so that no shard straddles two splits; if *largest_first* is true, the
+    splits come in order of decreasing size instead. The shards are
+    generated as they are needed."""
+    if by == 'rank':
+        bounds = [(0, count_nested_pairs_memoized(n))]
+    elif by == 'split':
+        bounds = splits(n)
+        if largest_first:
+            bounds.sort(key=lambda bound: bound[0] - bound[1])
+    else:
+        raise ValueError("unknown sharding: {}".format(by))
+    for lo, hi in bounds:
+        for start in range(lo, hi, chunk_size):
+            yield start, min(start + chunk_size, hi)
+
+
+def _enumerate_shard(n, lo, hi, encoded):
+    return list(nested_pairs_range(n, lo, hi, encoded))
+
+
+def nested_pair_chunks(n, by='split', workers=None, chunk_size=4096,
+                       ordered=True, encoded=False):
+    """Yield the nested pairs with degree *n* in lists of at most
+    *chunk_size*, enumerated on a pool of *workers* processes (see
+    shards() for *by*). If *ordered* is true, the chunks come in the order
+    of nested_pairs(n); otherwise they come as they are completed, and
+    with *by* = 'split', the largest splits are started first. If
+    *encoded* is true, the nested pairs are Dyck words (see encode_pair()),
+    which are cheaper to send between processes."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pending = shards(n, chunk_size, by, largest_first=not ordered)
+    running = []
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        try:
+            for shard in pending:
+                running.append(executor.submit(_enumerate_shard, n, *shard, encoded))
+                if len(running) == 2 * workers:
+                    break
+            while running:
+                if ordered:
+                    future = running.pop(0)
+                else:
+                    done, _ = concurrent.futures.wait(
+                        running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    future = done.pop()
+                    running.remove(future)
+                shard = next(pending, None)
+                if shard is not None:
+                    running.append(executor.submit(_enumerate_shard, n, *shard, encoded))
+                yield future.result()
+        finally:
+            for future in running:
+                future.cancel()
+
+
+def parallel_nested_pairs(n, consumer, **options):
+    """Call *consumer* with every chunk of nested pairs with degree *n*
+    yielded by nested_pair_chunks(n, **options), and return the number of
+    nested pairs."""
+    total = 0
+    for chunk in nested_pair_chunks(n, **options):
+        consumer(chunk)
+        total += len(chunk)
+    return total
+
+
+def test_shards():
+    print("test_shards")
+    for by in ('split', 'rank'):
+        for n in range(1, 10):
+            ranges = list(shards(n, 7, by))
+            assert ranges[0][0] == 0 and ranges[-1][1] == count_nested_pairs_memoized(n)
+            assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+            assert all(0 < hi - lo <= 7 for lo, hi in ranges)
+    # The largest split of degree 9 is the one with left parts of degree 1
+    # (tied with its mirror image, left parts of degree 8, which comes next).
+    assert next(shards(9, 7, 'split', largest_first=True)) == (0, 7)
+    assert sorted(shards(9, 7, 'split', largest_first=True)) == list(shards(9, 7))
+
+
+def test_parallel_nested_pairs():
+    print("test_parallel_nested_pairs")
+    expected = list(nested_pairs(9))
+    for by in ('split', 'rank'):
+        chunks = []
+        assert parallel_nested_pairs(9, chunks.append, by=by, workers=2, chunk_size=100) == len(expected)
+        assert [pair for chunk in chunks for pair in chunk] == expected
+        chunks = list(nested_pair_chunks(9, by, 2, 100, ordered=False, encoded=True))
+        assert sorted(word for chunk in chunks for word in chunk) == \
+            sorted(encode_pair(pair) for pair in expected)
+
+
+if __name__ == '__main__':
+    test_shards()
+    test_parallel_nested_pairs()
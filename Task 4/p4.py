@@ -13,9 +13,16 @@
 
 DAYS = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
 
+# Month-items för januari till december (se month() nedan).
+MONTH_ITEMS = (0, 3, 3, 6, 1, 4, 6, 2, 5, 0, 3, 5)
+
 # Ni får inte använda några moduler, endast basfunktioner. (Carroll's
 # beskrivning skiljer mellan old style och new style datum. Ni behöver
 # bara hantera new style datum.)
+#
+# (Code that needs modules, such as the vectorised weekdays, the
+# command-line tool and the benchmarks, is in the modules p4_*.py next to
+# this file.)
 
 def century(current):
     current = current % 4
@@ -67,43 +74,7 @@ def month(current):
 
     #Or did I just get lucky and found a loophole?
 
-    items = {"January":0,
-             "February":3,
-             "March": 3,
-             "April": 6,
-             "May": 1,
-             "June": 4,
-             "July": 6,
-             "August": 2,
-             "September": 5,
-             "October": 0,
-             "November": 3,
-             "December": 5}
-    if current == 1:
-        current = items["January"]
-    elif current == 2:
-        current = items["February"]
-    elif current == 3:
-        current = items["March"]
-    elif current == 4:
-        current = items["April"]
-    elif current == 5:
-        current = items["May"]
-    elif current == 6:
-        current = items["June"]
-    elif current == 7:
-        current = items["July"]
-    elif current == 8:
-        current = items["August"]
-    elif current == 9:
-        current = items["September"]
-    elif current == 10:
-        current = items["October"]
-    elif current == 11:
-        current = items["November"]
-    elif current == 12:
-        current = items["December"]
-    return current
+    return MONTH_ITEMS[current - 1]
 
 def day(year, month, day):
     if month == 1 or month == 2:
@@ -117,19 +88,18 @@ def day(year, month, day):
     return day
 
 def divide_by_seven(current, total):
-    total = total + current
-    if total > 7:
-        total = total % 7
-    return total
+    #"When an item or total exceeds 7" must include a total of exactly 7,
+    #otherwise DAYS[7] is out of range
+    return (total + current) % 7
 
 
 def day_of_week(y, m, d):
     #init vars
     current, total = 0, 0
 
-    #strip the needed digits from the year
-    century_begin = str(y)[:2]
-    century_begin = int(century_begin)
+    #split the year into century and the last two digits
+    #(works for years with any number of digits, and negative years)
+    century_begin = y // 100
     year_last_digits = y % 100
 
     #calc century
@@ -152,13 +122,126 @@ def day_of_week(y, m, d):
     return DAYS[total]
 
 
-print("1783-09-18: " + day_of_week(1783, 9, 18))
-print("2017-05-07: " + day_of_week(2017, 5, 7))
-print("2017-12-01: " + day_of_week(2017, 12, 1))
-print("2017-12-31: " + day_of_week(2017, 12, 31))
-print("LEAP 2016-02-29: " + day_of_week(2016, 2, 29))
-print("LEAP 2020-02-29: " + day_of_week(2020, 2, 29))
-print("LEAP 2032-02-29: " + day_of_week(2032, 2, 29))
+#The Gregorian calendar repeats itself every 400 years (146097 days, which
+#is exactly 20871 weeks), so the century- and year-items of a year only
+#depend on the year modulo 400. The table CYCLE has one entry per year in
+#the cycle: a tuple with the complete item (century + year + month, and the
+#leap year correction for January and February) for each month. There are
+#only 14 different such tuples, which are shared between the years. The
+#weekday is then one lookup, an addition and a modulo.
+#
+#The table is built the first time it is used, not when the module is
+#imported: until then CYCLE is a LazyTable, which builds the table and
+#puts it in its place.
+
+class LazyTable(object):
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+        self.table = None
+
+    def __getitem__(self, index):
+        if self.table is None:
+            self.table = self.build()
+            globals()[self.name] = self.table
+        return self.table[index]
+
+    def __len__(self):
+        return len(self[:])
+
+def month_items(year_item, leap):
+    return tuple((year_item + MONTH_ITEMS[m] - (leap and m < 2)) % 7 for m in range(12))
+
+def cycle_table():
+    shared = {}
+    table = []
+    for y in range(400):
+        year_item = (century(y // 100) + year(y % 100)) % 7
+        leap = y % 4 == 0 and (y % 100 != 0 or y % 400 == 0)
+        if (year_item, leap) not in shared:
+            shared[year_item, leap] = month_items(year_item, leap)
+        table.append(shared[year_item, leap])
+    return tuple(table)
+
+CYCLE = LazyTable('CYCLE', cycle_table)
+
+def weekday_index(y, m, d):
+    #index into DAYS (0 for Sunday) of the date y-m-d in the proleptic
+    #Gregorian calendar, with year 0 before year 1
+    return (CYCLE[y % 400][m - 1] + d) % 7
+
+def day_of_week_table(y, m, d):
+    return DAYS[(CYCLE[y % 400][m - 1] + d) % 7]
+
+
+#Ranges of dates. The weekday of the first date is looked up once, after
+#that every next date and weekday is one step from the previous one.
+
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def is_leap(y):
+    return y % 4 == 0 and (y % 100 != 0 or y % 400 == 0)
+
+def days_in_month(y, m):
+    return DAYS_IN_MONTH[m - 1] + (m == 2 and is_leap(y))
+
+def date_range(start, end, step=1):
+    #yield (y, m, d, weekday) for every step:th date from start to end
+    #(inclusive), where start and end are tuples (y, m, d)
+    if step < 1:
+        raise ValueError("step must be at least 1")
+    y, m, d = start
+    index = weekday_index(y, m, d)
+    length = days_in_month(y, m)
+    while (y, m, d) <= end:
+        yield y, m, d, DAYS[index]
+        index = (index + step) % 7
+        d = d + step
+        while d > length:
+            d = d - length
+            m = m + 1
+            if m > 12:
+                y, m = y + 1, 1
+            length = days_in_month(y, m)
+
+#For the aggregate queries, a date is turned into its day number (day 1
+#is 0001-01-01, a Monday), counting the leap days of all earlier years
+#directly: every 4th year, except every 100th, except every 400th. The
+#weekday of day number n is then DAYS[n % 7].
+
+def day_number(y, m, d):
+    before = y - 1
+    number = 365 * before + before // 4 - before // 100 + before // 400
+    number = number + sum(DAYS_IN_MONTH[:m - 1]) + (m > 2 and is_leap(y))
+    return number + d
+
+def count_weekday(start, end, weekday):
+    #number of dates from start to end (inclusive) that fall on weekday,
+    #a name from DAYS
+    w = DAYS.index(weekday)
+    first, last = day_number(*start), day_number(*end)
+    return max(0, (last - w) // 7 - (first - 1 - w) // 7)
+
+def dates_with_weekday(start, end, weekday):
+    #yield (y, m, d) for every date from start to end (inclusive) that
+    #falls on weekday, a name from DAYS
+    y, m, d = start
+    d = d + (DAYS.index(weekday) - weekday_index(y, m, d)) % 7
+    while d > days_in_month(y, m):
+        d = d - days_in_month(y, m)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    for y, m, d, _ in date_range((y, m, d), end, 7):
+        yield y, m, d
+
+
+if __name__ == '__main__':
+    print("1783-09-18: " + day_of_week(1783, 9, 18))
+    print("2017-05-07: " + day_of_week(2017, 5, 7))
+    print("2017-12-01: " + day_of_week(2017, 12, 1))
+    print("2017-12-31: " + day_of_week(2017, 12, 31))
+    print("LEAP 2016-02-29: " + day_of_week(2016, 2, 29))
+    print("LEAP 2020-02-29: " + day_of_week(2020, 2, 29))
+    print("LEAP 2032-02-29: " + day_of_week(2032, 2, 29))
 
 # Ledning
 #
@@ -0,0 +1,190 @@
+# Command-line tool that annotates the dates in a CSV or newline-delimited
+# JSON file with their weekdays.
+#
+#   python3 p4_annotate.py dates.csv --column date -o annotated.csv
+#   python3 p4_annotate.py --format ndjson --column ts < log.ndjson
+#
+# The input is read through a large buffer and handled in batches of rows:
+# the dates of a batch are parsed into three columns, their weekdays are
+# computed with days_of_week() from p4_vectorized.py in one pass, and the
+# annotated rows are written out before the next batch is read. Memory use
+# therefore depends on the batch size, not on the size of the file. Rows
+# whose date cannot be parsed get an empty weekday, and NDJSON lines that
+# are not JSON objects are copied unchanged.
+
+import argparse
+import array
+import csv
+import itertools
+import json
+import sys
+import time
+
+from p4 import DAYS
+from p4_vectorized import days_of_week
+
+BUFFER_SIZE = 1 << 20
+
+
+def parse_date(text):
+    """Return the year, month and day of the date at the start of *text*,
+    in the form YYYY-MM-DD (possibly followed by a time, and with any
+    number of digits in the year, which may be negative)."""
+    text = text.strip().split('T')[0].split(' ')[0]
+    y, m, d = text.rsplit('-', 2)
+    y, m, d = int(y), int(m), int(d)
+    if not (1 <= m <= 12 and 1 <= d <= 31):
+        raise ValueError("not a date: {}".format(text))
+    return y, m, d
+
+
+def weekdays(dates):
+    """Return the list of weekday names for the list of strings *dates*,
+    with an empty string for the strings that are not dates."""
+    years, months, days = array.array('q'), array.array('b'), array.array('b')
+    invalid = []
+    for i, text in enumerate(dates):
+        try:
+            y, m, d = parse_date(text)
+            years.append(y)
+        except (ValueError, AttributeError, OverflowError):
+            m, d = 1, 1
+            years.append(2000)
+            invalid.append(i)
+        months.append(m)
+        days.append(d)
+    result = [DAYS[i] for i in days_of_week(years, months, days)]
+    for i in invalid:
+        result[i] = ''
+    return result
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def column_index(column, fields):
+    """Return the index of the field *column* (a name from the header line
+    *fields*, or a 0-based index; *fields* is None if there is no header
+    line). Raise a ValueError that lists the columns if there is no such
+    field."""
+    if fields is not None and column in fields:
+        return fields.index(column)
+    try:
+        return int(column)
+    except ValueError:
+        if fields is None:
+            raise ValueError("the column must be an index when there is no header line")
+        raise ValueError("unknown column {!r}; the columns are: {}".format(
+            column, ', '.join(fields)))
+
+
+def annotate_csv(infile, outfile, column, name, delimiter, header, batch_size):
+    """Copy the CSV file *infile* to *outfile* with an extra last field
+    *name* holding the weekday of the date in the field *column* (see
+    column_index()). Rows that are shorter than the header line (or, with
+    no header line, than the field *column*) are padded with empty fields
+    first. Return the number of rows."""
+    reader = csv.reader(infile, delimiter=delimiter)
+    writer = csv.writer(outfile, delimiter=delimiter, lineterminator='\n')
+    if header:
+        fields = next(reader, None)
+        if fields is None:
+            return 0
+        index = column_index(column, fields)
+        writer.writerow(fields + [name])
+        width = len(fields)
+    else:
+        index = column_index(column, None)
+        width = index + 1
+    total = 0
+    for batch in batches(reader, batch_size):
+        dates = [row[index] if index < len(row) else None for row in batch]
+        for row, weekday in zip(batch, weekdays(dates)):
+            # Pad short rows so that the weekday lands in the added column.
+            if len(row) < width:
+                row.extend([''] * (width - len(row)))
+            row.append(weekday)
+        writer.writerows(batch)
+        total += len(batch)
+    return total
+
+
+def annotate_ndjson(infile, outfile, column, name, batch_size):
+    """Copy the newline-delimited JSON file *infile* to *outfile*, adding
+    the key *name* with the weekday of the date under the key *column* to
+    every object. Lines that are not JSON objects are copied unchanged.
+    Return the number of rows and the number of lines that were not JSON
+    objects."""
+    total = malformed = 0
+    for batch in batches(infile, batch_size):
+        lines = []
+        rows = []
+        for line in batch:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            if isinstance(row, dict):
+                rows.append(row)
+                lines.append(row)
+            else:
+                malformed += 1
+                lines.append(line if line.endswith('\n') else line + '\n')
+        for row, weekday in zip(rows, weekdays([row.get(column) for row in rows])):
+            row[name] = weekday
+        outfile.writelines(json.dumps(line, ensure_ascii=False) + '\n' if isinstance(line, dict) else line
+                           for line in lines)
+        total += len(lines)
+    return total, malformed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Annotate dates with weekdays.")
+    parser.add_argument('input', nargs='?', default='-', help="input file (default: standard input)")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: standard output)")
+    parser.add_argument('-f', '--format', choices=('csv', 'ndjson'), default='csv')
+    parser.add_argument('-c', '--column', default='0',
+                        help="date column: a header name or 0-based index for CSV, a key for NDJSON")
+    parser.add_argument('-n', '--name', default='weekday', help="name of the added column")
+    parser.add_argument('-d', '--delimiter', default=',')
+    parser.add_argument('--no-header', dest='header', action='store_false',
+                        help="the CSV input has no header line")
+    parser.add_argument('-b', '--batch-size', type=int, default=65536)
+    args = parser.parse_args(argv)
+
+    def open_file(path, mode, std):
+        if path == '-':
+            return open(std.fileno(), mode, buffering=BUFFER_SIZE, newline='', closefd=False)
+        return open(path, mode, buffering=BUFFER_SIZE, newline='')
+
+    start = time.perf_counter()
+    malformed = 0
+    with open_file(args.input, 'r', sys.stdin) as infile, \
+            open_file(args.output, 'w', sys.stdout) as outfile:
+        if args.format == 'csv':
+            try:
+                rows = annotate_csv(infile, outfile, args.column, args.name,
+                                    args.delimiter, args.header, args.batch_size)
+            except ValueError as error:
+                parser.error("--column: {}".format(error))
+        else:
+            rows, malformed = annotate_ndjson(infile, outfile, args.column, args.name,
+                                              args.batch_size)
+    elapsed = time.perf_counter() - start
+    if malformed:
+        print("{} lines were not JSON objects and were copied unchanged".format(malformed),
+              file=sys.stderr)
+    print("{} rows in {:.2f} s ({:.0f} rows/s)".format(
+        rows, elapsed, rows / elapsed if elapsed else 0), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
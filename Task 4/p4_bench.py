@@ -0,0 +1,130 @@
+# Benchmarks and cross-validation for the weekday functions in p4.py and
+# p4_vectorized.py.
+#
+#   python3 p4_bench.py            # benchmark and validate
+#   python3 p4_bench.py validate   # validate only
+#
+# Every path is validated against datetime.date.weekday() for every date
+# that datetime supports, 0001-01-01 to 9999-12-31, and the aggregate
+# queries count_weekday() and dates_with_weekday() on random ranges.
+
+import array
+import datetime
+import itertools
+import random
+import sys
+import time
+
+from p4 import DAYS, count_weekday, date_range, dates_with_weekday, day_of_week, day_of_week_table
+from p4_vectorized import days_of_week, numpy
+
+FIRST = datetime.date.min
+LAST = datetime.date.max
+
+
+def all_dates():
+    """Yield (y, m, d, weekday) for every date from FIRST to LAST, with the
+    weekday computed by datetime."""
+    for ordinal in range(FIRST.toordinal(), LAST.toordinal() + 1):
+        date = datetime.date.fromordinal(ordinal)
+        yield date.year, date.month, date.day, DAYS[ordinal % 7]
+
+
+def columns(dates):
+    years, months, days = array.array('l'), array.array('b'), array.array('b')
+    for y, m, d, _ in dates:
+        years.append(y)
+        months.append(m)
+        days.append(d)
+    return years, months, days
+
+
+def validate(batch_size=100000):
+    """Check day_of_week(), day_of_week_table(), date_range() and
+    days_of_week() against datetime for every date from FIRST to LAST, and
+    return the number of dates checked."""
+    ranged = date_range((FIRST.year, FIRST.month, FIRST.day), (LAST.year, LAST.month, LAST.day))
+    total = 0
+    dates = all_dates()
+    while True:
+        batch = list(itertools.islice(dates, batch_size))
+        if not batch:
+            return total
+        for (y, m, d, expected), actual in zip(batch, ranged):
+            assert day_of_week(y, m, d) == expected, (y, m, d)
+            assert day_of_week_table(y, m, d) == expected, (y, m, d)
+            assert actual == (y, m, d, expected), (y, m, d)
+        names = days_of_week(*columns(batch), names=True)
+        assert list(names) == [expected for _, _, _, expected in batch]
+        if numpy is not None:
+            arrays = [numpy.asarray(column) for column in columns(batch)]
+            assert list(days_of_week(*arrays, names=True)) == list(names)
+        total += len(batch)
+
+
+def validate_aggregates(ranges=2000, seed=0):
+    """Check count_weekday() and dates_with_weekday() against datetime for
+    *ranges* random ranges of up to three years (some of them empty), and
+    date_range() with steps other than 1. Return the number of ranges."""
+    rng = random.Random(seed)
+    for _ in range(ranges):
+        first = datetime.date.fromordinal(rng.randrange(1, LAST.toordinal() - 1200))
+        last = first + datetime.timedelta(rng.randrange(-3, 1100))
+        start = (first.year, first.month, first.day)
+        end = (last.year, last.month, last.day)
+        dates = [first + datetime.timedelta(i) for i in range((last - first).days + 1)]
+        for w, weekday in enumerate(DAYS):
+            expected = [(date.year, date.month, date.day) for date in dates
+                        if date.toordinal() % 7 == w]
+            assert count_weekday(start, end, weekday) == len(expected), (start, end, weekday)
+            assert list(dates_with_weekday(start, end, weekday)) == expected, (start, end, weekday)
+        step = rng.randrange(1, 40)
+        assert [date[:3] for date in date_range(start, end, step)] == \
+            [(date.year, date.month, date.day) for date in dates[::step]]
+    try:
+        next(date_range(start, end, 0))
+    except ValueError:
+        pass
+    else:
+        assert False
+    return ranges
+
+
+def rate(function, dates):
+    """Return the number of calls per second of *function* for the list of
+    (y, m, d) tuples *dates*."""
+    start = time.perf_counter()
+    for y, m, d in dates:
+        function(y, m, d)
+    return len(dates) / (time.perf_counter() - start)
+
+
+def benchmark(n=1000000):
+    """Print the weekdays per second of the scalar, the table-driven, the
+    incremental and the vectorised paths, over *n* consecutive dates."""
+    start = datetime.date(1900, 1, 1)
+    end = start + datetime.timedelta(n - 1)
+    dates = [(y, m, d) for y, m, d, _ in itertools.islice(all_dates(), start.toordinal() - 1, end.toordinal())]
+    years, months, days = columns((y, m, d, None) for y, m, d in dates)
+    print("path           dates/s")
+    print("scalar      {:10.0f}".format(rate(day_of_week, dates)))
+    print("table       {:10.0f}".format(rate(day_of_week_table, dates)))
+    t = time.perf_counter()
+    for _ in date_range(dates[0], dates[-1]):
+        pass
+    print("range       {:10.0f}".format(n / (time.perf_counter() - t)))
+    t = time.perf_counter()
+    days_of_week(years, months, days)
+    print("array       {:10.0f}".format(n / (time.perf_counter() - t)))
+    if numpy is not None:
+        arrays = [numpy.asarray(column) for column in (years, months, days)]
+        t = time.perf_counter()
+        days_of_week(*arrays)
+        print("numpy       {:10.0f}".format(n / (time.perf_counter() - t)))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['validate']:
+        benchmark()
+    print("validated {} dates".format(validate()))
+    print("validated {} ranges".format(validate_aggregates()))
@@ -0,0 +1,80 @@
+# Carroll's algorithm from p4.py applied to whole columns of dates at once.
+#
+# The steps of day_of_week() are the same, but every branch is replaced by
+# arithmetic: the century item is 2 * (3 - century % 4), the month item is
+# looked up in a table indexed by the month column, and the leap-year
+# correction for January and February is a mask that is subtracted from
+# the day item. With NumPy arrays, every step is one vectorised operation
+# over the whole column; with `array` buffers or lists, the same formula
+# runs in a single comprehension.
+
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from p4 import DAYS, MONTH_ITEMS
+
+
+def _is_numpy(*columns):
+    return numpy is not None and any(isinstance(c, numpy.ndarray) for c in columns)
+
+
+def _weekdays_numpy(years, months, days):
+    y = numpy.asarray(years, dtype=numpy.int64)
+    m = numpy.asarray(months, dtype=numpy.int64)
+    d = numpy.asarray(days, dtype=numpy.int64)
+    c, r = y // 100, y % 100
+    total = 2 * (3 - c % 4)
+    total += r // 12 + r % 12 + r % 12 // 4
+    total += numpy.asarray(MONTH_ITEMS, dtype=numpy.int64)[m - 1]
+    leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+    total += d - (leap & (m <= 2))
+    return (total % 7).astype(numpy.int8)
+
+
+def _weekdays_array(years, months, days):
+    items = MONTH_ITEMS
+    return array.array('b', [
+        (2 * (3 - y // 100 % 4)
+         + y % 100 // 12 + y % 100 % 12 + y % 100 % 12 // 4
+         + items[m - 1]
+         + d - ((m <= 2) & (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0)))) % 7
+        for y, m, d in zip(years, months, days)])
+
+
+def days_of_week(years, months, days, names=False):
+    """Return the weekdays of the dates with the years, months and days in
+    the columns *years*, *months* and *days*, as indices into DAYS (0 for
+    Sunday). If *names* is true, return the names from DAYS instead. The
+    columns may be NumPy arrays, in which case so is the result, or any
+    other sequences (such as `array` buffers), in which case the result is
+    an `array` buffer of indices or a list of names."""
+    if _is_numpy(years, months, days):
+        result = _weekdays_numpy(years, months, days)
+        return numpy.asarray(DAYS)[result] if names else result
+    result = _weekdays_array(years, months, days)
+    return [DAYS[i] for i in result] if names else result
+
+
+def test_days_of_week():
+    print("test_days_of_week")
+    import datetime
+    dates = [datetime.date(1583, 1, 1) + datetime.timedelta(i) for i in range(0, 400 * 366, 3)]
+    dates += [datetime.date(y, m, 29) for y in (1600, 1700, 1900, 2000, 2016, 2100) for m in (1, 2, 3)
+              if m != 2 or y % 4 == 0 and (y % 100 != 0 or y % 400 == 0)]
+    years = array.array('l', [date.year for date in dates])
+    months = array.array('b', [date.month for date in dates])
+    days = array.array('b', [date.day for date in dates])
+    expected = [(date.weekday() + 1) % 7 for date in dates]
+    assert list(days_of_week(years, months, days)) == expected
+    assert days_of_week([2017], [12], [31], names=True) == ['Sun']
+    if numpy is not None:
+        result = days_of_week(numpy.asarray(years), numpy.asarray(months), numpy.asarray(days))
+        assert result.tolist() == expected
+
+
+if __name__ == '__main__':
+    test_days_of_week()